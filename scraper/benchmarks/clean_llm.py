@@ -0,0 +1,87 @@
+"""Time OpenAI cleaning in parse-downloaded-data against a local stub.
+
+Copies the raw extractions in output/intermediate into a temporary
+directory and reparses every character from them with cleaning enabled,
+once per --clean-jobs value, against benchmarks/openai_stub.py. With
+--runs above 1 the same directory is cleaned again, after editing one
+move, to show what the cleaned-row cache saves.
+
+    python benchmarks/clean_llm.py --latency 0.5 --clean-jobs 1 8
+    python benchmarks/clean_llm.py --clean-jobs 8 --max-inflight 4
+    python benchmarks/clean_llm.py --clean-jobs 8 --runs 2
+"""
+from contextlib import redirect_stdout
+import json
+from pathlib import Path
+import argparse
+import io
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from openai_stub import OpenAIStub
+from scraper.commands.parse import parse_frame_data
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def edit_one_move(raw_file: Path) -> None:
+    """Change the damage of a character's first normal move."""
+    char_data = json.loads(raw_file.read_text())
+    move = char_data['normal_moves'][0]
+    move['damage'] = f"{move.get('damage') or ''}0"
+    raw_file.write_text(json.dumps(char_data, indent=2))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--raw-dir', type=Path, default=ROOT / 'output' / 'intermediate')
+    parser.add_argument('--latency', type=float, default=0.5, help='Fixed latency per completion in seconds')
+    parser.add_argument('--tokens-per-second', type=float, default=2000, help='Simulated generation speed')
+    parser.add_argument('--max-inflight', type=int, default=None, help='Answer 429 above this many requests')
+    parser.add_argument('--clean-jobs', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--rpm', type=float, default=500)
+    parser.add_argument('--tpm', type=float, default=0, help='Tokens per minute limit (0 disables it)')
+    parser.add_argument('--chunk-rows', type=int, default=20, help='Most rows from one table per request')
+    parser.add_argument('--runs', type=int, default=1, help='Clean the same directory this many times')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    raw_files = sorted(args.raw_dir.glob('*_raw.json'))
+    names = [raw_file.name[:-len('_raw.json')] for raw_file in raw_files]
+    results = []
+    for clean_jobs in args.clean_jobs:
+        server = OpenAIStub(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                            max_inflight=args.max_inflight).start()
+        os.environ['OPENAI_BASE_URL'] = server.base_url
+        with tempfile.TemporaryDirectory() as tmp:
+            intermediate_dir = Path(tmp) / 'intermediate'
+            intermediate_dir.mkdir()
+            for raw_file in raw_files:
+                shutil.copy(raw_file, intermediate_dir)
+
+            for run in range(args.runs):
+                if run:
+                    edit_one_move(intermediate_dir / raw_files[0].name)
+                requests, prompt_tokens, completion_tokens = server.requests, server.prompt_tokens, server.completion_tokens
+                start = time.perf_counter()
+                with redirect_stdout(io.StringIO()):
+                    parse_frame_data(Path(tmp), Path(tmp) / 'parsed.json', openai_api_key='stub',
+                                     reparse_characters=names, clean_jobs=clean_jobs, chunk_rows=args.chunk_rows,
+                                     requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+                elapsed = time.perf_counter() - start
+                cleaned = len(list(intermediate_dir.glob('*_cleaned.json')))
+                results.append(f'{clean_jobs:>3} jobs run {run + 1}: {elapsed:6.2f}s  '
+                               f'{server.requests - requests} requests  '
+                               f'{server.prompt_tokens - prompt_tokens} prompt tokens  '
+                               f'{server.completion_tokens - completion_tokens} completion tokens  '
+                               f'{server.throttled} throttled  peak {server.peak_inflight} in flight  '
+                               f'{cleaned}/{len(raw_files)} cleaned')
+        server.shutdown()
+
+    print('\n'.join(results))
+
+if __name__ == '__main__':
+    main()
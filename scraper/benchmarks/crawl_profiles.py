@@ -0,0 +1,67 @@
+"""Compare spider crawl profiles against the local Dustloop stand-in.
+
+Each profile crawls the full roster from benchmarks/standin.py in its own
+process (the Twisted reactor cannot be restarted), with the HTTP cache
+disabled so every page is fetched, and its own manifest so every page is
+parsed.
+
+    python benchmarks/crawl_profiles.py --latency 0.2 --max-inflight 4
+"""
+from multiprocessing import get_context
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from standin import StandinServer
+
+def crawl(profile: str, base_url: str, output: str, manifest: str) -> None:
+    os.environ.setdefault('SCRAPY_SETTINGS_MODULE', 'scraper.settings')
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from scraper.spiders.dustloop_spider import DustloopSpider
+
+    settings = get_project_settings()
+    settings.setdict(settings.getdict('CRAWL_PROFILES')[profile], priority='cmdline')
+    settings.set('HTTPCACHE_ENABLED', False, priority='cmdline')
+    settings.set('LOG_LEVEL', 'WARNING', priority='cmdline')
+    settings.set('DUSTLOOP_OUTPUT', output, priority='cmdline')
+    # A fresh manifest per profile, so no page is skipped and the real crawl's is left alone
+    settings.set('DUSTLOOP_MANIFEST', manifest, priority='cmdline')
+
+    process = CrawlerProcess(settings)
+    process.crawl(DustloopSpider, base_url=base_url)
+    process.start()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.2, help='Injected latency per request in seconds')
+    parser.add_argument('--max-inflight', type=int, default=None, help='Answer 429 above this many in-flight requests')
+    parser.add_argument('--profiles', nargs='+', default=['polite', 'fast'])
+    args = parser.parse_args()
+
+    context = get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        for profile in args.profiles:
+            server = StandinServer(latency=args.latency, max_inflight=args.max_inflight).start()
+            output = str(Path(tmp) / f'{profile}.jsonl')
+            manifest = str(Path(tmp) / f'{profile}_manifest.json')
+
+            start = time.perf_counter()
+            worker = context.Process(target=crawl, args=(profile, server.base_url, output, manifest))
+            worker.start()
+            worker.join()
+            elapsed = time.perf_counter() - start
+            server.shutdown()
+
+            with open(output, encoding='utf-8') as f:
+                characters = {json.loads(line)['character'] for line in f}
+            print(f'{profile:>8}: {elapsed:6.2f}s  {server.requests} requests  '
+                  f'{server.throttled} throttled  {len(characters)} characters')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Time scrape-data's downloader against the local Dustloop stand-in.
+
+Downloads the full roster from benchmarks/standin.py into a temporary
+directory, once per worker count.
+
+    python benchmarks/download.py --latency 0.2 --workers 1 8
+"""
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from standin import StandinServer
+from scraper.commands.download import download_frame_data
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.2, help='Injected latency per request in seconds')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--rate', type=float, default=0, help='Per-host request rate limit (0 disables it)')
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        server = StandinServer(latency=args.latency).start()
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            download_frame_data(output_dir=tmp, workers=workers, rate=args.rate,
+                                base_url=f'{server.base_url}/w/GGST')
+            elapsed = time.perf_counter() - start
+            pages = len(list(Path(tmp).glob('*_frame_data.html')))
+        server.shutdown()
+        results.append(f'{workers:>3} workers: {elapsed:6.2f}s  {server.requests} requests  {pages} pages')
+
+    print('\n'.join(results))
+
+if __name__ == '__main__':
+    main()
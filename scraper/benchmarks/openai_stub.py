@@ -0,0 +1,160 @@
+"""Local OpenAI-compatible chat completions server, used by the benchmarks.
+
+Answers POST /v1/chat/completions by echoing back the first JSON value in
+the last user message, so cleaning runs end to end without the network.
+A compact table (an object with "columns" and "rows") gets a patch reply
+instead, turning plain number strings in frame data columns into integers
+and renaming the RISC columns.
+Each reply takes a fixed latency plus time proportional to the prompt and
+reply lengths, and an optional cap on in-flight requests answers 429 when
+exceeded.
+
+    python benchmarks/openai_stub.py --port 8766 --latency 0.5 --max-inflight 4
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 scraper-cli parse-downloaded-data ...
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+import argparse
+import json
+import threading
+import time
+
+# Rough reply size in tokens, matching CHARS_PER_TOKEN in commands/parse.py
+CHARS_PER_TOKEN = 4
+
+# Columns whose plain numbers a compact table reply converts to integers
+NUMERIC_COLUMNS = {'damage', 'startup', 'active', 'recovery', 'on_block', 'on_hit'}
+
+class OpenAIStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, tokens_per_second: float = 0.0,
+                 max_inflight: Optional[int] = None, prompt_tokens_per_second: float = 0.0) -> None:
+        super().__init__(('127.0.0.1', port), OpenAIStubHandler)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.max_inflight = max_inflight
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.peak_inflight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+    def start(self) -> 'OpenAIStub':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def reply_for(self, messages: list[dict[str, Any]]) -> str:
+        """Echo the first JSON value in the last user message."""
+        content = next(m['content'] for m in reversed(messages) if m['role'] == 'user')
+        decoder = json.JSONDecoder()
+        for start, char in enumerate(content):
+            if char in '{[':
+                try:
+                    value = decoder.raw_decode(content, start)[0]
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(value, dict) and 'columns' in value and 'rows' in value:
+                    return json.dumps(self.patches_for(value))
+                return json.dumps(value)
+        return '{}'
+
+    def patches_for(self, table: dict[str, Any]) -> dict[str, Any]:
+        """Patch plain number strings in frame data columns to integers."""
+        patches = [
+            [index, column, int(value)]
+            for index, row in enumerate(table['rows'])
+            for column, value in zip(table['columns'], row)
+            if column in NUMERIC_COLUMNS and isinstance(value, str) and value.isdigit()
+        ]
+        renames = {
+            column: column.replace('\u2024', '')
+            for column in table['columns'] if '\u2024' in column
+        }
+        return {'renames': renames, 'patches': patches}
+
+class OpenAIStubHandler(BaseHTTPRequestHandler):
+    server: OpenAIStub
+
+    def do_POST(self) -> None:
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt_tokens = sum(len(m['content']) for m in request['messages']) // CHARS_PER_TOKEN
+        with server.lock:
+            server.requests += 1
+            server.inflight += 1
+            server.peak_inflight = max(server.peak_inflight, server.inflight)
+            throttled = server.max_inflight is not None and server.inflight > server.max_inflight
+            if throttled:
+                server.throttled += 1
+            else:
+                server.prompt_tokens += prompt_tokens
+        try:
+            if throttled:
+                self.send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                               {'Retry-After': '1'})
+                return
+
+            content = server.reply_for(request['messages'])
+            completion_tokens = len(content) // CHARS_PER_TOKEN
+            with server.lock:
+                server.completion_tokens += completion_tokens
+            delay = server.latency
+            if server.tokens_per_second:
+                delay += completion_tokens / server.tokens_per_second
+            if server.prompt_tokens_per_second:
+                delay += prompt_tokens / server.prompt_tokens_per_second
+            time.sleep(delay)
+            self.send_json(200, {
+                'id': 'chatcmpl-stub',
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': request['model'],
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens,
+                },
+            })
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+    def send_json(self, status: int, payload: dict[str, Any], headers: Optional[dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency', type=float, default=0.5)
+    parser.add_argument('--tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--max-inflight', type=int, default=None)
+    args = parser.parse_args()
+
+    server = OpenAIStub(args.port, args.latency, args.tokens_per_second, args.max_inflight,
+                        args.prompt_tokens_per_second)
+    print(f'Serving OpenAI stub at {server.base_url}')
+    server.serve_forever()
@@ -0,0 +1,76 @@
+"""Compare overdrive fallback prompts built from raw HTML and from the pruned page.
+
+For each page in output/frame_data_html, sends the OpenAI overdrive
+fallback once with the parsed page's HTML and once with prune_for_prompt's
+text to benchmarks/openai_stub.py, which charges time per prompt token.
+Also checks the pruned text still holds every overdrive input in the page.
+
+    python benchmarks/overdrive_fallback.py --prompt-tokens-per-second 5000
+"""
+from contextlib import redirect_stdout
+from pathlib import Path
+import argparse
+import io
+import logging
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from openai import OpenAI
+from openai_stub import OpenAIStub
+from scraper.commands.parse import (
+    CHARS_PER_TOKEN,
+    extract_overdrives_with_openai,
+    extract_table_data,
+    load_soup,
+    prune_for_prompt,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def timed_fallback(client: OpenAI, char_name: str, page_text: str) -> float:
+    start = time.perf_counter()
+    extract_overdrives_with_openai(client, char_name, page_text)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input-dir', type=Path, default=ROOT / 'output' / 'frame_data_html')
+    parser.add_argument('--latency', type=float, default=0.3, help='Fixed latency per completion in seconds')
+    parser.add_argument('--prompt-tokens-per-second', type=float, default=5000, help='Simulated prompt processing speed')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    server = OpenAIStub(latency=args.latency, prompt_tokens_per_second=args.prompt_tokens_per_second).start()
+    client = OpenAI(api_key='stub', base_url=server.base_url, max_retries=0)
+
+    print(f"{'file':<32} {'file tok':>9} {'html tok':>9} {'pruned tok':>10} {'html s':>7} {'pruned s':>8} {'inputs':>7}")
+    totals = [0.0] * 5
+    files = sorted(args.input_dir.glob('*_frame_data.html'))
+    missing = 0
+    for html_file in files:
+        char_name = html_file.stem.replace('_frame_data', '')
+        soup = load_soup(html_file)
+        html = str(soup)
+        pruned = prune_for_prompt(soup)
+        with redirect_stdout(io.StringIO()):
+            overdrives = extract_table_data(soup, 'Overdrives')
+        found = sum(move.get('input', '') in pruned for move in overdrives)
+        missing += len(overdrives) - found
+
+        html_s = timed_fallback(client, char_name, html)
+        pruned_s = timed_fallback(client, char_name, pruned)
+        row = [html_file.stat().st_size // CHARS_PER_TOKEN, len(html) // CHARS_PER_TOKEN,
+               len(pruned) // CHARS_PER_TOKEN, html_s, pruned_s]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{html_file.name[:32]:<32} {row[0]:>9} {row[1]:>9} {row[2]:>10} {html_s:>7.2f} {pruned_s:>8.2f} "
+              f"{found:>3}/{len(overdrives):<3}")
+    server.shutdown()
+
+    count = len(files)
+    print(f"{'mean':<32} {totals[0] / count:>9.0f} {totals[1] / count:>9.0f} {totals[2] / count:>10.0f} "
+          f"{totals[3] / count:>7.2f} {totals[4] / count:>8.2f}")
+    print(f"{missing} overdrive inputs missing from the pruned pages")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compare full html.parser trees with the targeted lxml parse in commands/parse.py.
+
+Reports per-file parse time and peak traced memory on the downloaded
+corpus in output/frame_data_html. Time is measured without tracemalloc
+running, since tracing slows parsing down considerably.
+
+    python benchmarks/parse_html.py
+"""
+from pathlib import Path
+from typing import Callable
+import argparse
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from scraper.commands.parse import load_soup
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def full_parse(html_file: Path) -> BeautifulSoup:
+    with open(html_file, 'r', encoding='utf-8') as f:
+        return BeautifulSoup(f.read(), 'html.parser')
+
+def measure(parse: Callable[[Path], BeautifulSoup], html_file: Path) -> tuple[float, float]:
+    """Return parse time in ms and peak traced memory in MB."""
+    start = time.perf_counter()
+    parse(html_file).decompose()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    tracemalloc.start()
+    soup = parse(html_file)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    soup.decompose()
+    return elapsed, peak
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input-dir', type=Path, default=ROOT / 'output' / 'frame_data_html')
+    args = parser.parse_args()
+
+    print(f"{'file':<32} {'size':>7} {'full ms':>8} {'full MB':>8} {'lxml ms':>8} {'lxml MB':>8}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    files = sorted(args.input_dir.glob('*_frame_data.html'))
+    for html_file in files:
+        full_ms, full_mb = measure(full_parse, html_file)
+        lxml_ms, lxml_mb = measure(load_soup, html_file)
+        for i, value in enumerate([full_ms, full_mb, lxml_ms, lxml_mb]):
+            totals[i] += value
+        size = html_file.stat().st_size // 1024
+        print(f"{html_file.name[:32]:<32} {size:>6}K {full_ms:>8.1f} {full_mb:>8.1f} {lxml_ms:>8.1f} {lxml_mb:>8.1f}")
+
+    count = len(files)
+    print(f"{'mean':<32} {'':>7} {totals[0] / count:>8.1f} {totals[1] / count:>8.1f} "
+          f"{totals[2] / count:>8.1f} {totals[3] / count:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Local stand-in for the Dustloop wiki, used by the benchmarks.
+
+Serves main_page.html at /w/GGST and the downloaded pages in
+output/frame_data_html at /w/GGST/<Character>/Frame_Data, with injected
+latency and an optional cap on in-flight requests that answers 429 when
+exceeded. Pages carry ETag and Last-Modified headers, and a matching
+If-None-Match gets a 304.
+
+    python benchmarks/standin.py --port 8765 --latency 0.2 --max-inflight 4
+"""
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+import argparse
+import hashlib
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.0, max_inflight: Optional[int] = None,
+                 html_dir: Path = ROOT / 'output' / 'frame_data_html') -> None:
+        super().__init__(('127.0.0.1', port), StandinHandler)
+        self.latency = latency
+        self.max_inflight = max_inflight
+        self.html_dir = html_dir
+        self.main_page = ROOT / 'main_page.html'
+        self.lock = threading.Lock()
+        self.inflight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def start(self) -> 'StandinServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def page_for(self, path: str) -> Optional[Path]:
+        """Map a wiki path to the file that backs it."""
+        path = path.split('?')[0].rstrip('/')
+        if path == '/w/GGST':
+            return self.main_page
+        parts = path.split('/')
+        if len(parts) == 5 and parts[:3] == ['', 'w', 'GGST'] and parts[4] == 'Frame_Data':
+            page = self.html_dir / f'{parts[3].lower()}_frame_data.html'
+            return page if page.exists() else None
+        return None
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def do_GET(self) -> None:
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.inflight += 1
+            throttled = server.max_inflight is not None and server.inflight > server.max_inflight
+            if throttled:
+                server.throttled += 1
+        try:
+            time.sleep(server.latency)
+            if throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            page = server.page_for(self.path)
+            if page is None:
+                self.send_error(404)
+                return
+            body = page.read_bytes()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            last_modified = formatdate(page.stat().st_mtime, usegmt=True)
+            if self.headers.get('If-None-Match') == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--max-inflight', type=int, default=None)
+    args = parser.parse_args()
+
+    server = StandinServer(args.port, args.latency, args.max_inflight)
+    print(f'Serving Dustloop stand-in at {server.base_url}')
+    server.serve_forever()
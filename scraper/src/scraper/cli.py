@@ -12,33 +12,35 @@ from typing import Optional, List
 import requests
 import json
 
-from scraper.db import init_db, import_json_to_db, get_database_url
+from scraper.db import IMPORT_MODES, init_db, import_api_json_to_db, import_json_to_db, get_database_url
 from scraper.spiders.dustloop_spider import DustloopSpider
 from .commands.download import download_frame_data
 from .commands.parse import parse_frame_data
-from scraper.models import (
-    Character,
-    NormalMoves,
-    SpecialMoves,
-    OverdriveMoves,
-    SystemCoreData,
-    SystemJumpData,
-    CharacterSpecificTable
-)
 
 app = typer.Typer()
 console = Console()
 
 @app.command()
-def scrape(output: str = "output/dustloop_tables.json"):
+def scrape(
+    output: str = "output/dustloop_tables.jsonl",
+    gzip: bool = typer.Option(
+        False,
+        help="Compress the JSONL output with gzip",
+    ),
+    profile: str = typer.Option(
+        "polite",
+        help="Crawl profile from CRAWL_PROFILES in settings (polite or fast)",
+    ),
+):
     """Run the Dustloop spider to scrape frame data."""
     settings = get_project_settings()
-    settings.set("FEEDS", {
-        output: {
-            "format": "json",
-            "overwrite": True
-        }
-    })
+    profiles = settings.getdict("CRAWL_PROFILES")
+    if profile not in profiles:
+        console.print(f"[red]Error:[/] Unknown crawl profile '{profile}'. Choose from: {', '.join(profiles)}")
+        raise typer.Exit(1)
+    settings.setdict(profiles[profile], priority="cmdline")
+    settings.set("DUSTLOOP_OUTPUT", output)
+    settings.set("DUSTLOOP_OUTPUT_GZIP", gzip)
     
     process = CrawlerProcess(settings)
     process.crawl(DustloopSpider)
@@ -56,7 +58,21 @@ def import_data(
     ),
     truncate: bool = typer.Option(
         True,
-        help="Whether to truncate existing data before importing",
+        help="Whether to truncate existing data before a full import (required by --mode full)",
+    ),
+    mode: str = typer.Option(
+        "incremental",
+        help="incremental writes only changed rows and deletes removed ones; full reloads every row; "
+             "swap loads a new copy of the tables and swaps it in without blocking readers (PostgreSQL only); "
+             "character replaces each character's rows in its own transaction",
+    ),
+    jobs: int = typer.Option(
+        4,
+        help="Characters imported at the same time in character mode",
+    ),
+    character: Optional[List[str]] = typer.Option(
+        None,
+        help="Only import these characters (character mode only)",
     ),
 ) -> None:
     """Import cleaned frame data from JSON into the database."""
@@ -64,6 +80,17 @@ def import_data(
         if not json_path.exists():
             typer.echo(f"Error: File {json_path} does not exist", err=True)
             raise typer.Exit(1)
+        if mode not in IMPORT_MODES:
+            console.print(f"[red]Error:[/] Unknown import mode '{mode}'. Choose from: {', '.join(IMPORT_MODES)}")
+            raise typer.Exit(1)
+        if character and mode != 'character':
+            console.print("[red]Error:[/] --character needs --mode character")
+            raise typer.Exit(1)
+        if not truncate and mode == 'full':
+            # Every row's key is unique, so a second copy of the rows can't be appended
+            console.print("[red]Error:[/] --mode full replaces all rows and can't be used with --no-truncate; "
+                          "use --mode incremental to keep existing rows")
+            raise typer.Exit(1)
         
         with Progress(
             SpinnerColumn(),
@@ -84,8 +111,8 @@ def import_data(
             
             engine = create_engine(database_url)
             
-            # Truncate all tables if requested
-            if truncate:
+            # Truncate all tables if requested; incremental imports work out what to delete themselves
+            if truncate and mode == 'full':
                 with Session(engine) as session:
                     try:
                         # Disable foreign key checks temporarily if using PostgreSQL
@@ -109,9 +136,13 @@ def import_data(
                         raise typer.Exit(1)
             
             # Now import the new data
-            import_json_to_db(json_path, database_url)
+            stats = import_json_to_db(json_path, database_url, mode, jobs, character)
             progress.update(task, description="Data import complete")
         
+        console.print(f"[blue]Imported {stats.summary()}[/blue]")
+        if stats.failed:
+            console.print(f"[red]Error:[/] Failed to import {len(stats.failed)} characters: {', '.join(stats.failed)}")
+            raise typer.Exit(1)
         console.print(f"[green]✓[/] Successfully imported frame data from {json_path}")
     
     except Exception as e:
@@ -152,9 +183,32 @@ def scrape_data(
         None,
         help="Specific character to download (downloads all if not specified)",
     ),
+    workers: int = typer.Option(
+        8,
+        help="Number of pages to download concurrently",
+    ),
+    rate: float = typer.Option(
+        8.0,
+        help="Maximum requests per second to Dustloop",
+    ),
+    retries: int = typer.Option(
+        3,
+        help="Retries per page on connection errors and 429/5xx responses",
+    ),
+    resume: bool = typer.Option(
+        False,
+        help="Only download characters that are missing or failed last time",
+    ),
 ) -> None:
     """Download frame data HTML pages from Dustloop."""
-    download_frame_data(output_dir=output_dir, character=character)
+    download_frame_data(
+        output_dir=output_dir,
+        character=character,
+        workers=workers,
+        rate=rate,
+        retries=retries,
+        resume=resume,
+    )
 
 @app.command()
 def parse_downloaded_data(
@@ -175,6 +229,30 @@ def parse_downloaded_data(
         None,
         help="List of character names to reparse from their raw data files",
     ),
+    jobs: int = typer.Option(
+        1,
+        help="Number of processes used to parse HTML files",
+    ),
+    cache: bool = typer.Option(
+        True,
+        help="Reuse raw data for unchanged HTML files and cleaned rows for unchanged moves",
+    ),
+    clean_jobs: int = typer.Option(
+        4,
+        help="Number of OpenAI cleaning requests in flight at the same time",
+    ),
+    chunk_rows: int = typer.Option(
+        20,
+        help="Most rows from one table sent in a single cleaning request",
+    ),
+    requests_per_minute: float = typer.Option(
+        500,
+        help="OpenAI requests per minute shared by all cleaning jobs (0 for no limit)",
+    ),
+    tokens_per_minute: float = typer.Option(
+        200_000,
+        help="OpenAI tokens per minute shared by all cleaning jobs (0 for no limit)",
+    ),
 ) -> None:
     """Parse downloaded frame data HTML files into structured JSON."""
     parse_frame_data(
@@ -182,6 +260,12 @@ def parse_downloaded_data(
         output_file=Path(output_file),
         openai_api_key=openai_api_key,
         reparse_characters=reparse,
+        jobs=jobs,
+        use_cache=cache,
+        clean_jobs=clean_jobs,
+        chunk_rows=chunk_rows,
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
     )
 
 @app.command()
@@ -302,7 +386,21 @@ def import_api_data(
     ),
     truncate: bool = typer.Option(
         True,
-        help="Whether to truncate existing data before importing",
+        help="Whether to truncate existing data before a full import (required by --mode full)",
+    ),
+    mode: str = typer.Option(
+        "incremental",
+        help="incremental writes only changed rows and deletes removed ones; full reloads every row; "
+             "swap loads a new copy of the tables and swaps it in without blocking readers (PostgreSQL only); "
+             "character replaces each character's rows in its own transaction",
+    ),
+    jobs: int = typer.Option(
+        4,
+        help="Characters imported at the same time in character mode",
+    ),
+    character: Optional[List[str]] = typer.Option(
+        None,
+        help="Only import these characters (character mode only)",
     ),
 ) -> None:
     """Import move data from the Dustloop API into the database."""
@@ -310,6 +408,17 @@ def import_api_data(
         if not json_path.exists():
             typer.echo(f"Error: File {json_path} does not exist", err=True)
             raise typer.Exit(1)
+        if mode not in IMPORT_MODES:
+            console.print(f"[red]Error:[/] Unknown import mode '{mode}'. Choose from: {', '.join(IMPORT_MODES)}")
+            raise typer.Exit(1)
+        if character and mode != 'character':
+            console.print("[red]Error:[/] --character needs --mode character")
+            raise typer.Exit(1)
+        if not truncate and mode == 'full':
+            # Every row's key is unique, so a second copy of the rows can't be appended
+            console.print("[red]Error:[/] --mode full replaces all rows and can't be used with --no-truncate; "
+                          "use --mode incremental to keep existing rows")
+            raise typer.Exit(1)
         
         with Progress(
             SpinnerColumn(),
@@ -330,8 +439,8 @@ def import_api_data(
             
             engine = create_engine(database_url)
             
-            # Truncate all tables if requested
-            if truncate:
+            # Truncate all tables if requested; incremental imports work out what to delete themselves
+            if truncate and mode == 'full':
                 with Session(engine) as session:
                     try:
                         # Disable foreign key checks temporarily if using PostgreSQL
@@ -354,192 +463,14 @@ def import_api_data(
                         console.print(f"[red]Error:[/] Failed to truncate tables: {str(e)}")
                         raise typer.Exit(1)
             
-            # Read and process the move data
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Group moves by character and type
-            moves_by_char: dict[str, dict[str, list[dict]]] = {}
-            for entry in data['cargoquery']:
-                move = entry['title']
-                char = move['chara']
-                move_type = move.get('type', '').lower()
-                
-                if char not in moves_by_char:
-                    moves_by_char[char] = {
-                        'normal_moves': [],
-                        'special_moves': [],
-                        'overdrive_moves': [],
-                        'system_core': [],
-                        'system_jump': [],
-                        'gatling_tables': [],
-                        'character_specific': []
-                    }
-                
-                # Route the move to the appropriate list based on type
-                if move_type == 'normal':
-                    moves_by_char[char]['normal_moves'].append(move)
-                elif move_type == 'special':
-                    moves_by_char[char]['special_moves'].append(move)
-                elif move_type in ('overdrive', 'super', 'Super'):  # Handle both overdrive and super types (case-insensitive)
-                    moves_by_char[char]['overdrive_moves'].append(move)
-                elif move_type == 'system_core':
-                    moves_by_char[char]['system_core'].append(move)
-                elif move_type == 'system_jump':
-                    moves_by_char[char]['system_jump'].append(move)
-                elif move_type == 'gatling':
-                    moves_by_char[char]['gatling_tables'].append(move)
-                else:
-                    # Log unknown types for debugging
-                    print(f"[yellow]Unknown move type '{move_type}' for {char}'s move: {move.get('name', move.get('input'))}[/yellow]")
-                    moves_by_char[char]['character_specific'].append(move)
-            
-            # Import data for each character
-            with Session(engine) as session:
-                for char_name, char_data in moves_by_char.items():
-                    progress.update(task, description=f"Importing data for {char_name}...")
-                    
-                    # Create character record if it doesn't exist
-                    char_slug = char_name.lower().replace(' ', '_')
-                    char = Character(
-                        name=char_name,
-                        slug=char_slug,
-                        display_name=char_name
-                    )
-                    session.add(char)
-                    session.flush()  # Get the character ID
-                    
-                    # Import normal moves
-                    for move in char_data['normal_moves']:
-                        normal_move = NormalMoves(
-                            character=char_name,
-                            table_name=f"{char_name} Normal Moves",
-                            table_type="normal",
-                            input=move['input'],
-                            damage=move['damage'],
-                            guard=move['guard'],
-                            startup=move['startup'],
-                            active=move['active'],
-                            recovery=move['recovery'],
-                            on_block=move['onBlock'],
-                            on_hit=move['onHit'],
-                            level=move['level'],
-                            counter_type=move['counter'],
-                            risc_gain=move['riscGain'],
-                            risc_loss=move['riscLoss'],
-                            proration=move['prorate'],
-                            notes=move.get('notes')
-                        )
-                        session.add(normal_move)
-                    
-                    # Import special moves
-                    for move in char_data['special_moves']:
-                        # If name is null, use the input as the name
-                        move_name = move['name'] if move['name'] else f"Special Move {move['input']}"
-                        special_move = SpecialMoves(
-                            character=char_name,
-                            table_name=f"{char_name} Special Moves",
-                            table_type="special",
-                            name=move_name,  # Use the fallback name if needed
-                            input=move['input'],
-                            damage=move['damage'],
-                            guard=move['guard'],
-                            startup=move['startup'],
-                            active=move['active'],
-                            recovery=move['recovery'],
-                            on_block=move['onBlock'],
-                            on_hit=move['onHit'],
-                            level=move['level'],
-                            counter_type=move['counter'],
-                            risc_gain=move['riscGain'],
-                            risc_loss=move['riscLoss'],
-                            proration=move['prorate'],
-                            notes=move.get('notes')
-                        )
-                        session.add(special_move)
-                    
-                    # Import overdrive moves
-                    for move in char_data['overdrive_moves']:
-                        # If name is null, use the input as the name
-                        move_name = move['name'] if move['name'] else f"Overdrive {move['input']}"
-                        overdrive_move = OverdriveMoves(
-                            character=char_name,
-                            table_name=f"{char_name} Overdrive Moves",
-                            table_type="overdrive",
-                            name=move_name,
-                            input=move['input'],
-                            damage=move['damage'],
-                            guard=move['guard'],
-                            startup=move['startup'],
-                            active=move['active'],
-                            recovery=move['recovery'],
-                            on_block=move['onBlock'],
-                            on_hit=move['onHit'],
-                            level=move['level'],
-                            counter_type=move['counter'],
-                            risc_gain=move['riscGain'],
-                            risc_loss=move['riscLoss'],
-                            proration=move['prorate'],
-                            tension_gain=move['inputTension'],
-                            notes=move.get('notes')
-                        )
-                        session.add(overdrive_move)
-                    
-                    # Import system core data
-                    for data in char_data['system_core']:
-                        system_core = SystemCoreData(
-                            character=char_name,
-                            table_name=f"{char_name} System Core",
-                            table_type="system_core",
-                            defense=data.get('defense'),
-                            guts=data.get('guts'),
-                            risc_gain_modifier=data.get('riscGain'),
-                            prejump=data.get('prejump'),
-                            backdash_duration=data.get('backdash_duration'),
-                            backdash_invuln=data.get('invuln'),
-                            backdash_airborne=data.get('backdash_airborne'),
-                            forward_dash=data.get('forward_dash'),
-                            unique_movement_options=data.get('notes'),
-                            movement_tension_gain=data.get('inputTension')
-                        )
-                        session.add(system_core)
-                    
-                    # Import system jump data
-                    for data in char_data['system_jump']:
-                        system_jump = SystemJumpData(
-                            character=char_name,
-                            table_name=f"{char_name} System Jump",
-                            table_type="system_jump",
-                            jump_duration=data.get('jump_duration'),
-                            high_jump_duration=data.get('high_jump_duration'),
-                            jump_height=data.get('jump_height'),
-                            high_jump_height=data.get('high_jump_height'),
-                            pre_instant_air_dash=data.get('pre_instant_air_dash'),
-                            air_dash_duration=data.get('air_dash_duration'),
-                            air_backdash_duration=data.get('air_backdash_duration'),
-                            air_dash_distance=data.get('air_dash_distance'),
-                            air_backdash_distance=data.get('air_backdash_distance'),
-                            jumping_tension_gain=data.get('jumping_tension_gain'),
-                            air_dash_tension_gain=data.get('air_dash_tension_gain'),
-                            notes=data.get('notes')
-                        )
-                        session.add(system_jump)
-                    
-                    # Import character-specific tables
-                    for data in char_data['character_specific']:
-                        char_specific = CharacterSpecificTable(
-                            character=char_name,
-                            table_name=f"{char_name} {data.get('name', 'Special Data')}",
-                            table_type="character_specific",
-                            headers=[],  # You'll need to determine how to extract headers
-                            rows=[data],  # Store the raw data for now
-                            notes=data.get('notes')
-                        )
-                        session.add(char_specific)
-                
-                session.commit()
-                progress.update(task, description="Data import complete")
+            # Write the moves in batches straight to their tables
+            stats = import_api_json_to_db(json_path, database_url, mode, jobs, character)
+            progress.update(task, description="Data import complete")
         
+        console.print(f"[blue]Imported {stats.summary()}[/blue]")
+        if stats.failed:
+            console.print(f"[red]Error:[/] Failed to import {len(stats.failed)} characters: {', '.join(stats.failed)}")
+            raise typer.Exit(1)
         console.print(f"[green]✓[/] Successfully imported move data from {json_path}")
     
     except Exception as e:
@@ -1,29 +1,211 @@
+import hashlib
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlparse
 import typer
 import requests
+from requests.adapters import HTTPAdapter
 from rich import print
-from typing import Optional, Union
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+from typing import Any, Optional, Union
 from bs4 import BeautifulSoup
 
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class RateLimiter:
+    """Space out request starts to each host so concurrent workers stay polite."""
+    
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot: dict[str, float] = {}
+    
+    def wait(self, url: str) -> None:
+        """Block until the next request to this URL's host may start."""
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def create_session(pool_size: int) -> requests.Session:
+    """Create a keep-alive session with a connection pool sized for the workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def fetch(
+    session: requests.Session,
+    limiter: RateLimiter,
+    url: str,
+    retries: int = 3,
+    backoff: float = 0.5,
+    max_retry_after: int = 60,
+    **kwargs: Any,
+) -> requests.Response:
+    """GET a URL, retrying connection errors and retryable statuses with jittered backoff.
+    
+    A Retry-After longer than max_retry_after seconds gives up on the URL
+    rather than holding a worker for that long.
+    """
+    for attempt in range(retries + 1):
+        limiter.wait(url)
+        try:
+            response = session.get(url, timeout=30, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                if int(retry_after) > max_retry_after:
+                    return response
+                time.sleep(int(retry_after))
+                continue
+        
+        # Full jitter: sleep anywhere up to the exponential backoff ceiling
+        time.sleep(random.uniform(0, backoff * 2 ** attempt))
+    
+    raise AssertionError("unreachable")
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file via a temporary sibling so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+class DownloadManifest:
+    """Per-character download records kept next to the downloaded HTML.
+    
+    Each entry holds the page URL, its ETag and Last-Modified headers, the
+    saved file's size and SHA-256, and whether the last attempt succeeded.
+    The manifest is rewritten after every character so an interrupted run
+    can pick up where it stopped.
+    """
+    
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+    
+    def get(self, char: str) -> Optional[dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(char)
+    
+    def record(self, char: str, entry: dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[char] = entry
+            write_atomic(self.path, json.dumps(self.entries, indent=2, sort_keys=True).encode('utf-8'))
+    
+    def is_complete(self, char: str, output_file: Path) -> bool:
+        """Whether the character's last download succeeded and its file is intact."""
+        entry = self.get(char)
+        if not entry or entry.get('status') != 'ok' or not output_file.exists():
+            return False
+        return hashlib.sha256(output_file.read_bytes()).hexdigest() == entry.get('sha256')
+
+def download_character(
+    session: requests.Session,
+    limiter: RateLimiter,
+    manifest: DownloadManifest,
+    base_url: str,
+    char: str,
+    output_path: Path,
+    retries: int = 3,
+    resume: bool = False,
+) -> str:
+    """Download one character's frame data page if it changed.
+    
+    Returns "downloaded", "not_modified" or "skipped".
+    """
+    url = f"{base_url}/{char}/Frame_Data"
+    output_file = output_path / f"{char.lower()}_frame_data.html"
+    
+    # Only send validators when the file they describe is still on disk
+    headers = {}
+    if manifest.is_complete(char, output_file):
+        if resume:
+            return "skipped"
+        entry = manifest.get(char) or {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    
+    try:
+        response = fetch(session, limiter, url, retries=retries, headers=headers)
+        if response.status_code == 304:
+            return "not_modified"
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+    except Exception:
+        manifest.record(char, {'url': url, 'status': 'failed'})
+        raise
+    
+    # Save to file
+    data = response.text.encode('utf-8')
+    write_atomic(output_file, data)
+    manifest.record(char, {
+        'url': url,
+        'status': 'ok',
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'size': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    })
+    return "downloaded"
+
 def download_frame_data(
     output_dir: str = "output/frame_data_html",
     character: Optional[str] = None,
+    workers: int = 8,
+    rate: float = 8.0,
+    retries: int = 3,
+    resume: bool = False,
+    base_url: str = "https://www.dustloop.com/w/GGST",
 ) -> None:
-    """Download frame data HTML pages from Dustloop for GGST characters."""
+    """Download frame data HTML pages from Dustloop for GGST characters.
+    
+    Args:
+        output_dir: Directory to store downloaded HTML files
+        character: Optional single character to download
+        workers: Number of pages to download concurrently
+        rate: Maximum requests started per second to each host
+        retries: Retries per page on connection errors and 429/5xx responses
+        resume: Skip characters whose last download completed instead of revalidating them
+        base_url: Base URL for GGST on Dustloop
+    """
     # Create output directory
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
-    # Base URL for GGST on Dustloop
-    base_url = "https://www.dustloop.com/w/GGST"
+    # One pooled keep-alive session and per-host rate limit shared by every request
+    session = create_session(workers)
+    limiter = RateLimiter(rate)
     
     if character:
         characters = [character]
     else:
         # Get the main page to find all characters
         print("[yellow]Fetching main page...[/yellow]")
-        response = requests.get(base_url)
+        response = fetch(session, limiter, base_url, retries=retries)
         if response.status_code != 200:
             print(f"[red]Failed to fetch main page: {response.status_code}[/red]")
             raise typer.Exit(1)
@@ -65,17 +247,41 @@ def download_frame_data(
             print(f"[yellow]Saved main page HTML to {debug_file} for debugging[/yellow]")
             raise typer.Exit(1)
     
-    # Download frame data for each character
-    for char in characters:
-        print(f"[green]Downloading frame data for {char}...[/green]")
-        frame_data_url = f"{base_url}/{char}/Frame_Data"
-        
-        response = requests.get(frame_data_url)
-        if response.status_code != 200:
-            print(f"[red]Failed to download {char}: {response.status_code}[/red]")
-            continue
-            
-        # Save to file
-        output_file = output_path / f"{char.lower()}_frame_data.html"
-        output_file.write_text(response.text)
-        print(f"[blue]Saved {char} frame data to {output_file}[/blue]") 
\ No newline at end of file
+    # Download frame data for all characters concurrently
+    manifest = DownloadManifest(output_path / "manifest.json")
+    results: dict[str, int] = {"downloaded": 0, "not_modified": 0, "skipped": 0}
+    failed: list[str] = []
+    
+    progress = Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        TimeElapsedColumn(),
+    )
+    
+    with progress, ThreadPoolExecutor(max_workers=workers) as executor:
+        task = progress.add_task("Downloading frame data...", total=len(characters))
+        futures = {
+            executor.submit(
+                download_character, session, limiter, manifest, base_url, char, output_path, retries, resume
+            ): char
+            for char in characters
+        }
+        for future in as_completed(futures):
+            char = futures[future]
+            try:
+                result = future.result()
+                results[result] += 1
+                if result == "downloaded":
+                    progress.console.print(f"[blue]Saved {char} frame data[/blue]")
+            except Exception as e:
+                failed.append(char)
+                progress.console.print(f"[red]Failed to download {char}: {e}[/red]")
+            progress.advance(task)
+    
+    print(
+        f"[green]Downloaded {results['downloaded']}, not modified {results['not_modified']}, "
+        f"already complete {results['skipped']}[/green]"
+    )
+    if failed:
+        print(f"[yellow]Failed to download {len(failed)} of {len(characters)} characters: {', '.join(sorted(failed))}[/yellow]")
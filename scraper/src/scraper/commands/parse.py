@@ -1,11 +1,20 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import hashlib
 import json
-from typing import Dict, List, Optional, Any, TypedDict
+from typing import Dict, Iterator, List, Optional, Any, Tuple, TypedDict
 from rich import print
 from rich.progress import Progress, SpinnerColumn, TextColumn, TimeElapsedColumn
-from bs4 import BeautifulSoup
-from openai import OpenAI
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from openai import APIConnectionError, APIStatusError, OpenAI, RateLimitError
+from scraper.normalize import normalize_table
+from scraper.validate import compile_validator
 import logging
+import multiprocessing
+import random
+import threading
+import time
+from .download import write_atomic
 
 # Configure logging
 logging.basicConfig(
@@ -143,6 +152,22 @@ CHARACTER_DATA_SCHEMA = {
     "additionalProperties": "false"
 }
 
+# Schema for the rows of each table in a character's data
+TABLE_SCHEMAS = {
+    'normal_moves': NORMAL_MOVE_SCHEMA,
+    'special_moves': SPECIAL_MOVE_SCHEMA,
+    'overdrive_moves': OVERDRIVE_MOVE_SCHEMA,
+    'system_core': SYSTEM_CORE_SCHEMA,
+    'system_jump': SYSTEM_JUMP_SCHEMA,
+}
+
+# Schemas compiled to plain functions once, so every stage's output can be checked on every run
+validate_character = compile_validator(CHARACTER_DATA_SCHEMA, 'validate_character')
+TABLE_VALIDATORS = {
+    table: compile_validator({"type": "array", "items": schema}, f'validate_{table}')
+    for table, schema in TABLE_SCHEMAS.items()
+}
+
 class CharacterData(TypedDict):
     name: str
     normal_moves: List[Dict[str, Any]]
@@ -154,141 +179,256 @@ class CharacterData(TypedDict):
 class AllData(TypedDict):
     characters: List[CharacterData]
 
-def extract_table_data(soup: BeautifulSoup, table_type: str, char_name: str = "", client: Optional[OpenAI] = None) -> List[Dict[str, Any]]:
-    """Extract data from a specific table type."""
-    # Find the section containing our table type
-    section = None
-    logging.info(f"Looking for table type: {table_type}")
-    
-    # For overdrive moves, also check for "Supers" section
-    search_terms = [table_type.lower().replace('_', ' ')]
-    if table_type.lower() == "overdrives":
-        search_terms.append("supers")
-    
-    # First try finding by h2 text content
-    for h2 in soup.find_all('h2'):
-        h2_text = h2.get_text().lower()
-        if any(term in h2_text for term in search_terms):
-            logging.info(f"Found h2 with matching text: {h2_text}")
-            section = h2.find_next('table')
-            if section:
-                logging.info("Found table after h2")
-            else:
-                logging.warning("No table found after matching h2")
-            break
+# Extraction only ever looks at headings and the tables after them
+PARSE_ONLY = SoupStrainer(['h2', 'table'])
+
+# Bump whenever extraction output changes so cached raw data is parsed again
+# 2: the overdrive fallback is sent the pruned page instead of the whole document
+PARSER_VERSION = 2
+
+def load_soup(html_file: Path) -> BeautifulSoup:
+    """Parse a frame data page with lxml, building only its h2 and table elements."""
+    with open(html_file, 'r', encoding='utf-8') as f:
+        return BeautifulSoup(f.read(), 'lxml', parse_only=PARSE_ONLY)
+
+# Section names searched for each table in a character's data
+TABLE_SECTIONS = {
+    'normal_moves': 'Normal_Moves',
+    'special_moves': 'Special_Moves',
+    'overdrive_moves': 'Overdrives',
+    'system_core': 'System_Core',
+    'system_jump': 'System_Jump',
+}
+
+class SectionIndex:
+    """Map a document's h2 headings to the first table after each, built in one walk.
     
-    # If not found, try finding by h2 with specific ID
-    if not section:
-        for term in search_terms:
-            h2 = soup.find('h2', id=term)
-            if h2:
-                logging.info(f"Found h2 with id={term}")
-                section = h2.find_next('table')
-                if section:
-                    logging.info("Found table after h2 with id")
-                else:
-                    logging.warning("No table found after h2 with id")
-                break
+    Headings are indexed by their text, h2 id and mw-headline id, so finding
+    any number of table types never walks the document again.
+    """
     
-    # If still not found, try finding by span with mw-headline class and specific ID
-    if not section:
-        for term in search_terms:
-            headline = soup.find('span', {'class': 'mw-headline', 'id': term})
-            if headline:
-                logging.info(f"Found span with class=mw-headline and id={term}")
-                section = headline.find_parent('h2').find_next('table')
-                if section:
-                    logging.info("Found table after headline span")
-                else:
-                    logging.warning("No table found after headline span")
+    def __init__(self, soup: BeautifulSoup) -> None:
+        self.headings: List[Dict[str, Any]] = []
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_headline_id: Dict[str, Dict[str, Any]] = {}
+        
+        # Headings still waiting for the next table in document order
+        pending: List[Dict[str, Any]] = []
+        for element in soup.find_all(['h2', 'table']):
+            if element.name == 'table':
+                for heading in pending:
+                    heading['table'] = element
+                pending = []
+                continue
+            
+            headline = element.find('span', {'class': 'mw-headline'})
+            heading = {
+                'text': element.get_text().strip(),
+                'id': element.get('id', ''),
+                'headline_id': headline.get('id', '') if headline else '',
+                'table': None,
+            }
+            self.headings.append(heading)
+            pending.append(heading)
+            self.by_id.setdefault(heading['id'], heading)
+            self.by_headline_id.setdefault(heading['headline_id'], heading)
+    
+    def find_table(self, table_type: str) -> Optional[Tag]:
+        """Find the table for a section, trying heading text, h2 id, then mw-headline id."""
+        logging.info(f"Looking for table type: {table_type}")
+        
+        # For overdrive moves, also check for "Supers" section
+        search_terms = [table_type.lower().replace('_', ' ')]
+        if table_type.lower() == "overdrives":
+            search_terms.append("supers")
+        
+        # First try finding by h2 text content
+        for heading in self.headings:
+            h2_text = heading['text'].lower()
+            if any(term in h2_text for term in search_terms):
+                logging.info(f"Found h2 with matching text: {h2_text}")
+                if heading['table'] is not None:
+                    logging.info("Found table after h2")
+                    return heading['table']
+                logging.warning("No table found after matching h2")
                 break
+        
+        # If not found, try finding by h2 with specific ID, then by mw-headline span ID
+        for lookup, description in [(self.by_id, "h2 with id"), (self.by_headline_id, "span with class=mw-headline and id")]:
+            for term in search_terms:
+                heading = lookup.get(term)
+                if heading:
+                    logging.info(f"Found {description}={term}")
+                    if heading['table'] is not None:
+                        logging.info(f"Found table after {description}")
+                        return heading['table']
+                    logging.warning(f"No table found after {description}")
+                    break
+        
+        return None
+    
+    def log_headings(self) -> None:
+        """Log all h2s and their IDs to help debug a missing section."""
+        for heading in self.headings:
+            logging.warning(f"  - h2 id='{heading['id']}' headline_id='{heading['headline_id']}' text='{heading['text']}'")
+
+def extract_character_tables(
+    soup: BeautifulSoup,
+    char_name: str = "",
+    client: Optional[OpenAI] = None,
+    page_size: int = 0,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Extract every table in TABLE_SECTIONS from one document, indexing its sections once.
+    
+    page_size is the size of the raw HTML file, only used to log how much pruning saves.
+    """
+    index = SectionIndex(soup)
+    return {
+        key: extract_table_data(soup, table_type, char_name, client, index, page_size)
+        for key, table_type in TABLE_SECTIONS.items()
+    }
+
+# Sections left out of pages sent to OpenAI, since they never hold move data
+PRUNED_SECTIONS = {'glossary', 'navigation'}
+
+def prune_for_prompt(soup: BeautifulSoup) -> str:
+    """Reduce a page to its section headings and tables as plain text rows."""
+    lines = []
+    skip = False
+    for element in soup.find_all(['h2', 'table']):
+        if element.name == 'h2':
+            heading = element.get_text(' ', strip=True)
+            skip = heading.lower() in PRUNED_SECTIONS
+            if not skip:
+                lines.append(f"## {heading}")
+            continue
+        
+        # Nested tables are already included in their parent's cell text
+        if skip or element.find_parent('table') is not None:
+            continue
+        for tr in element.find_all('tr'):
+            if tr.find_parent('table') is not element:
+                continue
+            cells = [' '.join(cell.get_text(' ', strip=True).split()) for cell in tr.find_all(['th', 'td'], recursive=False)]
+            if any(cells):
+                lines.append(' | '.join(cells))
+    return '\n'.join(lines)
+
+def extract_overdrives_with_openai(client: OpenAI, char_name: str, page_text: str, page_size: int = 0) -> List[Dict[str, Any]]:
+    """Ask OpenAI to find the overdrive moves in a pruned page."""
+    logging.info("Attempting to extract overdrive moves using OpenAI...")
+    if page_size:
+        logging.info(
+            f"Pruned page for {char_name} from ~{page_size // CHARS_PER_TOKEN} "
+            f"to ~{len(page_text) // CHARS_PER_TOKEN} tokens"
+        )
+    else:
+        logging.info(f"Pruned page for {char_name} to ~{len(page_text) // CHARS_PER_TOKEN} tokens")
+    
+    prompt = f"""Please extract the overdrive moves from this page for {char_name}.
+    The page has been reduced to its section headings, which start with '##', and its tables,
+    with one row per line and cells separated by ' | '.
+    Page content:
+{page_text}
+    
+    The data should be returned as a JSON array where each move has these fields:
+    - name (string, required): Name of the overdrive move
+    - input (string, required): Input command for the move
+    - damage (string or number, optional): Damage dealt
+    - guard (string, optional): Guard type
+    - startup (string or number, optional): Startup frames
+    - active (string or number, optional): Active frames
+    - recovery (string or number, optional): Recovery frames
+    - on_block (string or number, optional): Frame advantage on block
+    - on_hit (string or number, optional): Frame advantage on hit
+    - level (string, optional): Attack level
+    - counter_type (string, optional): Counter hit type
+    - invuln (string, optional): Invulnerability frames
+    - proration (string, optional): Damage proration
+    - risc_gain (string or number, optional): RISC gauge gain
+    - risc_loss (string or number, optional): RISC gauge loss
+    - tension_gain (string or number, optional): Tension gauge gain
+    
+    Return ONLY a direct JSON array of moves, not wrapped in any object. Every character should have at least 2 overdrive moves.
+    If you can't find the exact values, use empty strings or null for optional fields, but always include name and input.
+    
+    Look for a section with a header containing 'Overdrive', 'Overdrives', or 'Super' text, and extract the move data from the table that follows it.
+    Note that these powerful moves might be called either 'Overdrives' or 'Supers' in the documentation.
+    
+    Example response format:
+    [
+        {{
+            "name": "Move 1",
+            "input": "236236H",
+            "damage": null,
+            "guard": null
+        }},
+        {{
+            "name": "Move 2",
+            "input": "632146H",
+            "damage": null,
+            "guard": null
+        }}
+    ]"""
+    
+    try:
+        start = time.perf_counter()
+        response = create_chat_completion(
+            client,
+            None,
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are a fighting game frame data parser. Extract move data from wiki page tables and return it in a consistent JSON format."
+                },
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+        
+        logging.info(f"Overdrive fallback for {char_name} took {time.perf_counter() - start:.2f}s")
+        if response.choices[0].message.content:
+            result = json.loads(response.choices[0].message.content)
+            # Handle both array and nested object formats
+            if isinstance(result, dict):
+                # If it's a dict, look for moves array in any field
+                for value in result.values():
+                    if isinstance(value, list):
+                        return value
+                # If no array found, return empty list
+                return []
+            # If it's already an array, return it directly
+            elif isinstance(result, list):
+                return result
+            return []
+    except Exception as e:
+        logging.error(f"Failed to extract overdrive moves using OpenAI: {str(e)}")
+    
+    return []
+
+def extract_table_data(
+    soup: BeautifulSoup,
+    table_type: str,
+    char_name: str = "",
+    client: Optional[OpenAI] = None,
+    index: Optional[SectionIndex] = None,
+    page_size: int = 0,
+) -> List[Dict[str, Any]]:
+    """Extract data from a specific table type."""
+    # Find the section containing our table type
+    if index is None:
+        index = SectionIndex(soup)
+    section = index.find_table(table_type)
     
     if not section:
         # Log all h2s and their IDs to help debug
         logging.warning(f"Failed to find table for {table_type}. Available h2s:")
-        for h2 in soup.find_all('h2'):
-            h2_id = h2.get('id', '')
-            h2_text = h2.get_text().strip()
-            headline = h2.find('span', {'class': 'mw-headline'})
-            headline_id = headline.get('id', '') if headline else ''
-            logging.warning(f"  - h2 id='{h2_id}' headline_id='{headline_id}' text='{h2_text}'")
+        index.log_headings()
         
         # If this is an overdrive moves table and we have OpenAI available, try using it
         if table_type == "Overdrives" and client and char_name:
-            logging.info("Attempting to extract overdrive moves using OpenAI...")
-            
-            prompt = f"""Please extract the overdrive moves from this HTML for {char_name}.
-            HTML content: {str(soup)}
-            
-            The data should be returned as a JSON array where each move has these fields:
-            - name (string, required): Name of the overdrive move
-            - input (string, required): Input command for the move
-            - damage (string or number, optional): Damage dealt
-            - guard (string, optional): Guard type
-            - startup (string or number, optional): Startup frames
-            - active (string or number, optional): Active frames
-            - recovery (string or number, optional): Recovery frames
-            - on_block (string or number, optional): Frame advantage on block
-            - on_hit (string or number, optional): Frame advantage on hit
-            - level (string, optional): Attack level
-            - counter_type (string, optional): Counter hit type
-            - invuln (string, optional): Invulnerability frames
-            - proration (string, optional): Damage proration
-            - risc_gain (string or number, optional): RISC gauge gain
-            - risc_loss (string or number, optional): RISC gauge loss
-            - tension_gain (string or number, optional): Tension gauge gain
-            
-            Return ONLY a direct JSON array of moves, not wrapped in any object. Every character should have at least 2 overdrive moves.
-            If you can't find the exact values, use empty strings or null for optional fields, but always include name and input.
-            
-            Look for a section with a header containing 'Overdrive', 'Overdrives', or 'Super' text, and extract the move data from the table that follows it.
-            Note that these powerful moves might be called either 'Overdrives' or 'Supers' in the documentation.
-            
-            Example response format:
-            [
-                {{
-                    "name": "Move 1",
-                    "input": "236236H",
-                    "damage": null,
-                    "guard": null
-                }},
-                {{
-                    "name": "Move 2",
-                    "input": "632146H",
-                    "damage": null,
-                    "guard": null
-                }}
-            ]"""
-            
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a fighting game frame data parser. Extract move data from HTML and return it in a consistent JSON format."
-                        },
-                        {"role": "user", "content": prompt}
-                    ],
-                    response_format={"type": "json_object"}
-                )
-                
-                if response.choices[0].message.content:
-                    result = json.loads(response.choices[0].message.content)
-                    # Handle both array and nested object formats
-                    if isinstance(result, dict):
-                        # If it's a dict, look for moves array in any field
-                        for value in result.values():
-                            if isinstance(value, list):
-                                return value
-                        # If no array found, return empty list
-                        return []
-                    # If it's already an array, return it directly
-                    elif isinstance(result, list):
-                        return result
-                    return []
-            except Exception as e:
-                logging.error(f"Failed to extract overdrive moves using OpenAI: {str(e)}")
+            return extract_overdrives_with_openai(client, char_name, prune_for_prompt(soup), page_size)
         
         return []
     
@@ -316,11 +456,176 @@ def extract_table_data(soup: BeautifulSoup, table_type: str, char_name: str = ""
     logging.info(f"Extracted {len(rows)} rows")
     return rows
 
+def character_name(html_file: Path) -> str:
+    """Extract the character name from a frame data file name."""
+    return html_file.stem.replace('_frame_data', '').replace('_', ' ').title()
+
+def raw_file_for(intermediate_dir: Path, char_name: str) -> Path:
+    """Path of the raw extracted data saved for a character."""
+    return intermediate_dir / f"{char_name.lower().replace(' ', '_')}_raw.json"
+
+class ParseCache:
+    """Records which HTML input each _raw.json file was extracted from.
+    
+    Entries map an HTML file name to its SHA-256, the PARSER_VERSION that
+    extracted it and whether the OpenAI fallback was available. A file whose
+    entry still matches reuses its saved raw data instead of being parsed.
+    """
+    
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.digests: Dict[Path, str] = {}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+    
+    def digest(self, html_file: Path) -> str:
+        if html_file not in self.digests:
+            self.digests[html_file] = hashlib.sha256(html_file.read_bytes()).hexdigest()
+        return self.digests[html_file]
+    
+    def stamp(self, html_file: Path, use_openai: bool) -> Dict[str, Any]:
+        return {'sha256': self.digest(html_file), 'parser_version': PARSER_VERSION, 'openai': use_openai}
+    
+    def lookup(self, html_file: Path, raw_file: Path, use_openai: bool) -> Optional[CharacterData]:
+        """Return the saved raw data if the file is unchanged since it was extracted."""
+        try:
+            stamp = self.stamp(html_file, use_openai)
+        except OSError:
+            return None  # unreadable files are left for the parser to report
+        if self.entries.get(html_file.name) != stamp or not raw_file.exists():
+            return None
+        with open(raw_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def record(self, html_file: Path, use_openai: bool) -> None:
+        self.entries[html_file.name] = self.stamp(html_file, use_openai)
+    
+    def save(self) -> None:
+        write_atomic(self.path, json.dumps(self.entries, indent=2, sort_keys=True).encode('utf-8'))
+
+def parse_character_file(html_file: Path, intermediate_dir: Path, openai_api_key: Optional[str] = None) -> CharacterData:
+    """Parse one character's HTML file and save its raw data.
+    
+    Runs in a worker process when parsing with several jobs, so it takes the
+    API key rather than a client and only returns plain data.
+    """
+    client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+    
+    char_name = character_name(html_file)
+    
+    start = time.perf_counter()
+    soup = load_soup(html_file)
+    logging.info(f"Parsed {html_file.name} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    
+    # Initialize character data
+    tables = extract_character_tables(soup, char_name, client, html_file.stat().st_size)
+    char_data: CharacterData = {
+        'name': char_name,
+        'normal_moves': tables['normal_moves'],
+        'special_moves': tables['special_moves'],
+        'overdrive_moves': tables['overdrive_moves'],
+        'system_core': tables['system_core'],
+        'system_jump': tables['system_jump'],
+    }
+    
+    # Free the tree before moving on to the next file
+    soup.decompose()
+    
+    # Save raw extracted data
+    raw_file = raw_file_for(intermediate_dir, char_name)
+    with open(raw_file, 'w', encoding='utf-8') as f:
+        json.dump(char_data, f, indent=2)
+    print(f"[blue]Saved raw data to {raw_file}[/blue]")
+    
+    return char_data
+
+def parse_character_files(
+    html_files: List[Path],
+    intermediate_dir: Path,
+    openai_api_key: Optional[str] = None,
+    jobs: int = 1,
+    cache: Optional[ParseCache] = None,
+) -> Iterator[Tuple[Path, Optional[CharacterData]]]:
+    """Parse HTML files, yielding (file, data) in input order as each is ready.
+    
+    Files the cache knows are unchanged reuse their raw data. The rest are
+    parsed, in a process pool when there is more than one job. A file that
+    fails to parse is logged and yielded with None so the rest still run.
+    """
+    use_openai = bool(openai_api_key)
+    cached: Dict[Path, CharacterData] = {}
+    if cache:
+        for html_file in html_files:
+            char_name = character_name(html_file)
+            char_data = cache.lookup(html_file, raw_file_for(intermediate_dir, char_name), use_openai)
+            if char_data is not None:
+                cached[html_file] = char_data
+        if cached:
+            print(f"[blue]Reusing raw data for {len(cached)} unchanged files[/blue]")
+    
+    parsed = _parse_character_files(
+        [html_file for html_file in html_files if html_file not in cached],
+        intermediate_dir,
+        openai_api_key,
+        jobs,
+    )
+    for html_file in html_files:
+        if html_file in cached:
+            yield html_file, cached[html_file]
+            continue
+        html_file, char_data = next(parsed)
+        if cache and char_data is not None:
+            cache.record(html_file, use_openai)
+        yield html_file, char_data
+
+def _parse_character_files(
+    html_files: List[Path],
+    intermediate_dir: Path,
+    openai_api_key: Optional[str],
+    jobs: int,
+) -> Iterator[Tuple[Path, Optional[CharacterData]]]:
+    if not html_files:
+        return
+    if jobs <= 1:
+        for html_file in html_files:
+            print(f"[green]Processing {html_file.name}...[/green]")
+            try:
+                yield html_file, parse_character_file(html_file, intermediate_dir, openai_api_key)
+            except Exception as e:
+                logging.exception(f"Failed to parse {html_file.name}")
+                print(f"[red]Error parsing {html_file.name}: {str(e)}[/red]")
+                yield html_file, None
+        return
+    
+    # Spawn rather than fork, since the progress display runs a refresh thread
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [
+            executor.submit(parse_character_file, html_file, intermediate_dir, openai_api_key)
+            for html_file in html_files
+        ]
+        for html_file, future in zip(html_files, futures):
+            try:
+                char_data = future.result()
+                print(f"[green]Processed {html_file.name}[/green]")
+                yield html_file, char_data
+            except Exception as e:
+                logging.exception(f"Failed to parse {html_file.name}")
+                print(f"[red]Error parsing {html_file.name}: {str(e)}[/red]")
+                yield html_file, None
+
 def parse_frame_data(
     input_dir: Path,
     output_file: Path,
     openai_api_key: Optional[str] = None,
     reparse_characters: Optional[List[str]] = None,
+    jobs: int = 1,
+    use_cache: bool = True,
+    clean_jobs: int = 4,
+    chunk_rows: int = 20,
+    requests_per_minute: float = 500,
+    tokens_per_minute: float = 200_000,
 ) -> None:
     """Parse downloaded HTML files into structured data.
     
@@ -329,11 +634,18 @@ def parse_frame_data(
         output_file: Where to save the final JSON
         openai_api_key: Optional API key for OpenAI cleaning
         reparse_characters: Optional list of character names to reparse from raw data
+        jobs: Number of worker processes used to parse HTML files
+        use_cache: Reuse raw data for unchanged HTML files and cleaned rows for unchanged moves
+        clean_jobs: Number of OpenAI cleaning requests in flight at the same time
+        chunk_rows: Most rows from one table sent in a single cleaning request
+        requests_per_minute: OpenAI request limit shared by all cleaning jobs
+        tokens_per_minute: OpenAI token limit shared by all cleaning jobs
     """
-    # Initialize OpenAI client if API key is provided
+    # Initialize OpenAI client if API key is provided; transient errors are retried by create_chat_completion
     client = None
+    limiter = RequestLimiter(requests_per_minute, tokens_per_minute)
     if openai_api_key:
-        client = OpenAI(api_key=openai_api_key)
+        client = OpenAI(api_key=openai_api_key, max_retries=0)
     
     # Create intermediate output directory
     intermediate_dir = output_file.parent / "intermediate"
@@ -359,7 +671,7 @@ def parse_frame_data(
         html_files = []
         raw_files = []
         for char_name in reparse_characters:
-            raw_file = intermediate_dir / f"{char_name.lower().replace(' ', '_')}_raw.json"
+            raw_file = raw_file_for(intermediate_dir, char_name)
             if raw_file.exists():
                 raw_files.append((char_name, raw_file))
             else:
@@ -371,7 +683,7 @@ def parse_frame_data(
                     print(f"[red]Warning: No data found for character {char_name}[/red]")
     else:
         # Process all HTML files
-        html_files = list(input_dir.glob('*_frame_data.html'))
+        html_files = sorted(input_dir.glob('*_frame_data.html'))
         raw_files = []
     
     # Create progress display
@@ -381,37 +693,31 @@ def parse_frame_data(
         TimeElapsedColumn(),
     )
     
-    with progress:
-        # Process HTML files first
-        for html_file in html_files:
-            print(f"[green]Processing {html_file.name}...[/green]")
-            
-            # Extract character name from filename
-            char_name = html_file.stem.replace('_frame_data', '').replace('_', ' ').title()
-            
-            with open(html_file, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-            
-            # Initialize character data
-            char_data: CharacterData = {
-                'name': char_name,
-                'normal_moves': extract_table_data(soup, 'Normal_Moves', char_name, client),
-                'special_moves': extract_table_data(soup, 'Special_Moves', char_name, client),
-                'overdrive_moves': extract_table_data(soup, 'Overdrives', char_name, client),
-                'system_core': extract_table_data(soup, 'System_Core', char_name, client),
-                'system_jump': extract_table_data(soup, 'System_Jump', char_name, client),
-            }
-            
-            # Save raw extracted data
-            raw_file = intermediate_dir / f"{char_name.lower().replace(' ', '_')}_raw.json"
-            with open(raw_file, 'w', encoding='utf-8') as f:
-                json.dump(char_data, f, indent=2)
-            print(f"[blue]Saved raw data to {raw_file}[/blue]")
-            
-            if client:
-                char_data = clean_character_data(client, char_data, progress, intermediate_dir)
-            
-            all_data['characters'].append(char_data)
+    cache = ParseCache(intermediate_dir / "parse_manifest.json") if use_cache else None
+    cleaning_cache = CleaningCache(intermediate_dir / "clean_cache.json") if use_cache else None
+    failed: List[str] = []
+    cleaned: List[Future[CharacterData]] = []
+    report: Dict[str, Dict[str, List[str]]] = {}
+    # Characters wait on their chunks in one pool while the chunk requests run in another,
+    # so a character never holds a request slot while waiting
+    with progress, ThreadPoolExecutor(max_workers=max(clean_jobs, 1)) as cleaner, \
+            ThreadPoolExecutor(max_workers=max(clean_jobs, 1)) as requester:
+        def clean(char_data: CharacterData) -> Future[CharacterData]:
+            return cleaner.submit(
+                clean_character_data, client, char_data, progress, intermediate_dir,
+                limiter, cleaning_cache, requester, chunk_rows,
+            )
+        
+        # Process HTML files first, cleaning each one while later files are still parsing
+        for html_file, char_data in parse_character_files(html_files, intermediate_dir, openai_api_key, jobs, cache):
+            if char_data is None:
+                failed.append(html_file.name)
+                continue
+            report[char_data['name']] = {'raw': validate_character(char_data)}
+            cleaned.append(clean(char_data))
+        
+        if cache:
+            cache.save()
         
         # Process raw files for reparsing
         for char_name, raw_file in raw_files:
@@ -419,70 +725,346 @@ def parse_frame_data(
             
             with open(raw_file, 'r', encoding='utf-8') as f:
                 char_data = json.load(f)
-            
-            if client:
-                char_data = clean_character_data(client, char_data, progress, intermediate_dir)
-            
+            report[char_data['name']] = {'raw': validate_character(char_data)}
+            cleaned.append(clean(char_data))
+        
+        # Collect in submission order so the output doesn't depend on which request finished first
+        for result in cleaned:
+            char_data = result.result()
+            report[char_data['name']]['cleaned'] = validate_character(char_data)
             all_data['characters'].append(char_data)
+        
+        if cleaning_cache:
+            cleaning_cache.save()
     
     # Save the final parsed data
     output_file.parent.mkdir(parents=True, exist_ok=True)
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(all_data, f, indent=2)
     
-    print(f"[green]Successfully processed {len(html_files) + len(raw_files)} characters![/green]")
+    print(f"[green]Successfully processed {len(html_files) + len(raw_files) - len(failed)} characters![/green]")
+    if failed:
+        print(f"[red]Failed to parse {len(failed)} files: {', '.join(failed)}[/red]")
     print(f"[blue]Data saved to {output_file}[/blue]")
     print(f"[blue]Individual character data saved in {intermediate_dir}[/blue]")
+    report_validation(report, intermediate_dir / "validation_report.json")
+
+def report_validation(report: Dict[str, Dict[str, List[str]]], report_file: Path) -> None:
+    """Save the schema errors found for each character and stage, and summarize them."""
+    write_atomic(report_file, json.dumps(report, indent=2).encode('utf-8'))
+    
+    invalid = {name: stages for name, stages in report.items() if any(stages.values())}
+    if not invalid:
+        print(f"[green]All {len(report)} characters match the schema[/green]")
+        return
+    for name, stages in invalid.items():
+        counts = ', '.join(f"{len(errors)} {stage}" for stage, errors in stages.items() if errors)
+        print(f"[yellow]Schema errors for {name}: {counts}[/yellow]")
+    print(f"[yellow]{len(invalid)} of {len(report)} characters have schema errors, see {report_file}[/yellow]")
+
+# Rough prompt size in tokens, counting the reply as about as long as the prompt
+CHARS_PER_TOKEN = 4
+
+class RequestLimiter:
+    """Space out OpenAI requests to stay under requests- and tokens-per-minute limits.
+    
+    Tokens are drawn from a bucket that refills at the per-minute rate, so a
+    burst of small requests can start at once while large ones wait their turn.
+    """
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.request_interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.token_capacity = tokens_per_minute
+        self.tokens_per_second = tokens_per_minute / 60.0
+        self.tokens = tokens_per_minute
+        self.lock = threading.Lock()
+        self.updated = time.monotonic()
+        self.next_request = 0.0
+    
+    def wait(self, tokens: int) -> None:
+        """Block until a request using this many tokens may start."""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request)
+            if self.tokens_per_second:
+                self.tokens = min(self.token_capacity, self.tokens + (now - self.updated) * self.tokens_per_second)
+                self.updated = now
+                # Go into debt for what's missing; later requests wait for it to be repaid
+                tokens = min(tokens, self.token_capacity)
+                if tokens > self.tokens:
+                    start = max(start, now + (tokens - self.tokens) / self.tokens_per_second)
+                self.tokens -= tokens
+            self.next_request = start + self.request_interval
+        if start > now:
+            time.sleep(start - now)
+
+def is_transient(error: Exception) -> bool:
+    """Whether an OpenAI error is worth retrying: rate limits, timeouts, dropped connections and server errors."""
+    # APITimeoutError is an APIConnectionError
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+def create_chat_completion(
+    client: OpenAI,
+    limiter: Optional[RequestLimiter],
+    retries: int = 8,
+    backoff: float = 0.5,
+    **kwargs: Any,
+) -> Any:
+    """Create a chat completion, waiting on the limiter and backing off on transient errors."""
+    tokens = sum(len(message['content']) for message in kwargs['messages']) * 2 // CHARS_PER_TOKEN
+    for attempt in range(retries + 1):
+        if limiter:
+            limiter.wait(tokens)
+        try:
+            return client.chat.completions.create(**kwargs)
+        except (APIConnectionError, APIStatusError) as e:
+            if attempt == retries or not is_transient(e):
+                raise
+            # Wait at least as long as the server asks, plus full jitter so the
+            # workers that were all refused together don't all retry together
+            response = getattr(e, 'response', None)
+            retry_after = response.headers.get("retry-after", "") if response is not None else ""
+            delay = int(retry_after) if retry_after.isdigit() else 0
+            delay += random.uniform(0, backoff * 2 ** attempt)
+            logging.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+    
+    raise AssertionError("unreachable")
+
+CLEANING_MODEL = "gpt-4o-mini"
+
+CLEANING_SYSTEM_PROMPT = """You are a helpful assistant that cleans and validates fighting game frame data.
+You MUST return only valid JSON describing your changes in the patch format given in the prompt.
+Pay special attention to:
+- Different requirements for normal vs special/overdrive moves
+- Converting numeric values appropriately
+- Only reporting cells you actually change
+"""
+
+CLEANING_INSTRUCTIONS = """The data is one table as a JSON object with its column names and one array
+of cell values per row, in column order. A null cell means the row has no value for that column.
+
+Please:
+1. Standardize move names (for special and overdrive moves)
+2. Convert frame data to integers where appropriate:
+   - Convert clear numbers (e.g. "12" -> 12)
+   - Leave ranges as strings (e.g. "12-14")
+   - Leave special values as strings (e.g. "±0", "+2~3")
+3. Fix any obvious errors or inconsistencies
+4. Ensure all required fields are present
+5. Ensure RISC-related columns are correctly named:
+   - Use "risc_gain" (not "risec_gain" or "risk_gain")
+   - Use "risc_loss" (not "risec_loss" or "risk_loss")
+
+Reply with ONLY your changes, as a JSON object:
+{"renames": {"old column": "new column"}, "patches": [[row index, "column", new value], ...]}
+Row indexes start at 0 and patches use the original column names; a patch to a column that
+isn't listed adds that field. Leave out every cell you don't change, and reply
+{"renames": {}, "patches": []} if nothing needs to change."""
+
+# Changes whenever the model or prompts do, so rows cleaned by an older setup are cleaned again
+CLEANING_VERSION = hashlib.sha256(
+    "\n".join([CLEANING_MODEL, CLEANING_SYSTEM_PROMPT, CLEANING_INSTRUCTIONS]).encode('utf-8')
+).hexdigest()[:16]
+
+class CleaningCache:
+    """Cleaned rows from earlier runs, keyed by a hash of the raw row.
+    
+    The key covers the table the row is in, the row with its keys sorted and
+    its strings stripped, and CLEANING_VERSION. Only rows without an entry
+    are sent to the model.
+    """
+    
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+    
+    @staticmethod
+    def key(table: str, row: Dict[str, Any]) -> str:
+        normalized = {k: v.strip() if isinstance(v, str) else v for k, v in row.items()}
+        payload = json.dumps([CLEANING_VERSION, table, normalized], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            return self.entries.get(key)
+    
+    def put(self, key: str, row: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[key] = row
+    
+    def save(self) -> None:
+        with self.lock:
+            data = json.dumps(self.entries, sort_keys=True).encode('utf-8')
+        write_atomic(self.path, data)
 
-def clean_character_data(client: OpenAI, char_data: CharacterData, progress: Progress, intermediate_dir: Path) -> CharacterData:
-    """Clean character data using OpenAI."""
+def clean_character_data(
+    client: Optional[OpenAI],
+    char_data: CharacterData,
+    progress: Progress,
+    intermediate_dir: Path,
+    limiter: Optional[RequestLimiter] = None,
+    cache: Optional[CleaningCache] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    chunk_rows: int = 20,
+) -> CharacterData:
+    """Clean character data with the local rules, then OpenAI for rows they can't resolve.
+    
+    Unresolved rows the cache hasn't seen are sent in chunks of up to
+    chunk_rows from a single table. Chunks run on the executor when one is
+    given, and each is validated and retried on its own. Without a client
+    only the rules are applied.
+    """
+    name = char_data['name']
+    
+    # Rows the rules resolve are done; the rest are candidates for the model
+    unresolved: Dict[str, List[Tuple[int, str]]] = {}
+    row_count = 0
+    for table in TABLE_SECTIONS:
+        if table not in char_data:
+            continue
+        rows, reasons = normalize_table(char_data[table] or [], TABLE_SCHEMAS[table])  # type: ignore[literal-required]
+        char_data[table] = rows  # type: ignore[literal-required]
+        row_count += len(rows)
+        unresolved[table] = [(i, CleaningCache.key(table, rows[i])) for i in sorted(reasons)]
+        for i in sorted(reasons):
+            logging.debug(f"Unresolved {table} row {rows[i].get('input')} for {name}: {'; '.join(reasons[i])}")
+    unresolved_count = sum(len(rows) for rows in unresolved.values())
+    logging.info(f"Normalized {row_count} rows for {name}, {unresolved_count} left unresolved")
+    
+    cleaned: Dict[str, Dict[str, Any]] = {}
+    if cache:
+        for table_keys in unresolved.values():
+            for _, key in table_keys:
+                row = cache.get(key)
+                if row is not None:
+                    cleaned[key] = row
+    
+    # Send only the unresolved rows that are new or changed since they were last cleaned
+    chunks = []
+    if client:
+        for table, table_keys in unresolved.items():
+            pending = [(key, char_data[table][i]) for i, key in table_keys if key not in cleaned]  # type: ignore[literal-required]
+            for i in range(0, len(pending), chunk_rows):
+                chunks.append((table, pending[i:i + chunk_rows]))
+    
+    if chunks:
+        pending_count = sum(len(chunk) for _, chunk in chunks)
+        logging.info(f"Cleaning {pending_count} of {row_count} rows for {name} in {len(chunks)} chunks")
+        requests = [
+            (table, chunk, executor.submit(request_cleaning, client, name, table, [row for _, row in chunk], progress, limiter)
+             if executor else None)
+            for table, chunk in chunks
+        ]
+        for table, chunk, future in requests:
+            rows = [row for _, row in chunk]
+            cleaned_rows = future.result() if future else request_cleaning(client, name, table, rows, progress, limiter)
+            if cleaned_rows is None:
+                continue  # keep this chunk's normalized rows, uncached, so the next run tries again
+            for (key, _), row in zip(chunk, cleaned_rows):
+                cleaned[key] = row
+                if cache:
+                    cache.put(key, row)
+    
+    # Put the cleaned rows back in their original places
+    for table, table_keys in unresolved.items():
+        for i, key in table_keys:
+            if key in cleaned:
+                char_data[table][i] = cleaned[key]  # type: ignore[literal-required]
+    
+    # Save cleaned data
+    cleaned_file = intermediate_dir / f"{name.lower().replace(' ', '_')}_cleaned.json"
+    with open(cleaned_file, 'w', encoding='utf-8') as f:
+        json.dump(char_data, f, indent=2)
+    print(f"[blue]Saved cleaned data to {cleaned_file}[/blue]")
+    
+    return char_data
+
+def encode_table(table: str, rows: List[Dict[str, Any]]) -> str:
+    """Encode rows as compact JSON with the column names given once."""
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    payload = {
+        'table': table,
+        'columns': columns,
+        'rows': [[row.get(column) for column in columns] for row in rows],
+    }
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False)
+
+def apply_patches(rows: List[Dict[str, Any]], reply: Any) -> List[Dict[str, Any]]:
+    """Apply a cleaning reply's cell patches and column renames to copies of the rows."""
+    if not isinstance(reply, dict) or not isinstance(reply.get('patches', []), list) \
+            or not isinstance(reply.get('renames', {}), dict):
+        raise ValueError('reply should be an object with a "patches" list and a "renames" object')
+    
+    patched = [dict(row) for row in rows]
+    for patch in reply.get('patches', []):
+        if not (isinstance(patch, list) and len(patch) == 3 and isinstance(patch[0], int)
+                and not isinstance(patch[0], bool) and isinstance(patch[1], str) and 0 <= patch[0] < len(rows)):
+            raise ValueError(f"patch {json.dumps(patch)} should be [row index, \"column\", value] for one of the {len(rows)} rows")
+        index, column, value = patch
+        patched[index][column] = value
+    
+    renames = reply.get('renames', {})
+    if renames:
+        patched = [rename_columns(row, renames) for row in patched]
+    return patched
+
+def rename_columns(row: Dict[str, Any], renames: Dict[str, str]) -> Dict[str, Any]:
+    """Rename a row's columns, refusing renames that would overwrite another column."""
+    renamed: Dict[str, Any] = {}
+    for column, value in row.items():
+        target = renames.get(column, column)
+        if target in renamed:
+            raise ValueError(f"renaming to \"{target}\" would overwrite a column the row already has")
+        renamed[target] = value
+    return renamed
+
+def request_cleaning(
+    client: OpenAI,
+    name: str,
+    table: str,
+    rows: List[Dict[str, Any]],
+    progress: Progress,
+    limiter: Optional[RequestLimiter] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """Ask OpenAI to clean rows from one table, retrying replies that don't match its schema."""
     last_error = None
     max_retries = 2
+    cleaned_rows = None
+    data = encode_table(table, rows)
+    label = f"{table} for {name}"
     
-    # Create a task for this character's cleaning process
-    task_id = progress.add_task(f"Cleaning data for {char_data['name']}...", total=None)
+    # Create a task for this chunk's cleaning process
+    task_id = progress.add_task(f"Cleaning {label}...", total=None)
     
     for attempt in range(max_retries + 1):
         try:
             if attempt > 0:
-                progress.update(task_id, description=f"Retrying {char_data['name']} (attempt {attempt + 1})...")
+                progress.update(task_id, description=f"Retrying {label} (attempt {attempt + 1})...")
             
             # Create a prompt for data validation and cleanup
-            prompt = f"""Please validate and clean up this frame data for {char_data['name']}.
-            Original data: {json.dumps(char_data, indent=2)}
-            
-            Please:
-            1. Standardize move names (for special and overdrive moves)
-            2. Convert frame data to integers where appropriate:
-               - Convert clear numbers (e.g. "12" -> 12)
-               - Leave ranges as strings (e.g. "12-14")
-               - Leave special values as strings (e.g. "±0", "+2~3")
-            3. Fix any obvious errors or inconsistencies
-            4. Ensure all required fields are present
-            5. Ensure RISC-related fields are correctly named:
-               - Use "risc_gain" (not "risec_gain" or "risk_gain")
-               - Use "risc_loss" (not "risec_loss" or "risk_loss")
-            6. Return ONLY valid JSON data that matches the schema provided in response_format
-            
-            The response MUST be valid JSON and maintain the exact same structure as the input."""
+            prompt = (
+                f"Please validate and clean up this frame data for {name}.\n"
+                f"Data: {data}\n\n"
+                f"{CLEANING_INSTRUCTIONS}"
+            )
             
             # If this is a retry, add error context
             if last_error:
-                prompt += f"\n\nThe previous attempt failed with error: {last_error}\nPlease ensure the response is valid JSON and fix any syntax errors."
+                prompt += f"\n\nThe previous attempt failed with error: {last_error}\nPlease ensure the response is valid JSON in the patch format above."
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
+            response = create_chat_completion(
+                client,
+                limiter,
+                model=CLEANING_MODEL,
                 messages=[
-                    {
-                        "role": "system", 
-                        "content": """You are a helpful assistant that cleans and validates fighting game frame data.
-                        You MUST return only valid JSON data that matches the schema provided in response_format.
-                        Pay special attention to:
-                        - Different requirements for normal vs special/overdrive moves
-                        - Converting numeric values appropriately
-                        - Maintaining the exact structure specified
-                        """
-                    },
+                    {"role": "system", "content": CLEANING_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={
@@ -490,34 +1072,30 @@ def clean_character_data(client: OpenAI, char_data: CharacterData, progress: Pro
                 }
             )
             
-            # Parse the cleaned data
+            # Apply the changes locally and check the rows still fit the table's schema
             content = response.choices[0].message.content
             if content:  # Check if content is not None
-                cleaned_data = json.loads(content)
-                char_data.update(cleaned_data)
-                
-                # Save cleaned data
-                cleaned_file = intermediate_dir / f"{char_data['name'].lower().replace(' ', '_')}_cleaned.json"
-                with open(cleaned_file, 'w', encoding='utf-8') as f:
-                    json.dump(char_data, f, indent=2)
-                
-                progress.update(task_id, description=f"[green]Successfully cleaned {char_data['name']}[/green]")
-                print(f"[blue]Saved cleaned data to {cleaned_file}[/blue]")
+                patched = apply_patches(rows, json.loads(content))
+                errors = TABLE_VALIDATORS[table](patched, table)
+                if errors:
+                    raise ValueError("; ".join(errors[:5]))
+                cleaned_rows = patched
+                progress.update(task_id, description=f"[green]Successfully cleaned {label}[/green]")
                 break  # Success, exit retry loop
         
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, ValueError) as e:
             last_error = str(e)
             if attempt < max_retries:
-                print(f"[yellow]Attempt {attempt + 1} failed for {char_data['name']}, retrying...[/yellow]")
+                print(f"[yellow]Attempt {attempt + 1} failed for {label}, retrying...[/yellow]")
             else:
-                progress.update(task_id, description=f"[red]Failed to clean {char_data['name']}[/red]")
-                print(f"[red]Failed to clean data for {char_data['name']} after {max_retries + 1} attempts[/red]")
+                progress.update(task_id, description=f"[red]Failed to clean {label}[/red]")
+                print(f"[red]Failed to clean {label} after {max_retries + 1} attempts: {last_error}[/red]")
         except Exception as e:
-            progress.update(task_id, description=f"[red]Error cleaning {char_data['name']}[/red]")
-            print(f"[yellow]Warning: OpenAI processing failed for {char_data['name']}: {str(e)}[/yellow]")
+            progress.update(task_id, description=f"[red]Error cleaning {label}[/red]")
+            print(f"[yellow]Warning: OpenAI processing failed for {label}: {str(e)}[/yellow]")
             break  # Don't retry on non-JSON errors
     
     # Remove the task when done
     progress.remove_task(task_id)
     
-    return char_data 
\ No newline at end of file
+    return cleaned_rows
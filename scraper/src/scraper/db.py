@@ -1,8 +1,21 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import io
+import itertools
 import os
 import json
+import re
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, List, Type, Union, Set, Dict, Any, TypeVar
-from sqlmodel import Session, create_engine, select
+from typing import Optional, List, Type, Set, Dict, Any, Deque, Iterable, Iterator, Tuple
+from rich import print
+from sqlalchemy import Column, Connection, Engine, Index, MetaData, Table, delete, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import create_engine, select
+from scraper.jsonstream import iter_json_array
 from scraper.models import (
     Character,
     SystemCoreData,
@@ -16,12 +29,8 @@ from scraper.models import (
 from scraper.models import (
     GatlingTable,
     CharacterSpecificTable,
-    BaseTable,
 )
 
-# Type variable for our table models
-TableType = TypeVar('TableType', bound=BaseTable)
-
 def get_database_url() -> str:
     """Get the database URL from environment variables or use a default."""
     return os.getenv(
@@ -37,208 +46,648 @@ def init_db(database_url: Optional[str] = None) -> None:
     engine = create_engine(database_url)
     SQLModel.metadata.create_all(engine)
 
-def convert_to_model(data: Dict[str, Any], model_class: Type[TableType]) -> TableType:
-    """Convert a dictionary to a model instance, handling field name mapping."""
-    # Map field names from JSON to model fields
-    field_mapping = {
-        'P': 'p_moves',
-        'K': 'k_moves',
-        'S': 's_moves',
-        'H': 'h_moves',
-        'D': 'd_moves',
-        'Cancel': 'cancel_options',
-        'R․I․S․C․ Gain Modifier': 'risc_gain_modifier',
-    }
+class ImportStats:
+    """Rows written to each table by an import, and how long it took."""
+    
+    def __init__(self) -> None:
+        self.rows: Dict[str, int] = {}
+        self.unchanged = 0
+        self.deleted = 0
+        self.failed: List[str] = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+    
+    @property
+    def total(self) -> int:
+        return sum(self.rows.values())
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+    
+    def summary(self) -> str:
+        summary = f"{self.total} rows in {self.elapsed:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+        if self.unchanged or self.deleted:
+            summary += f", {self.unchanged} unchanged, {self.deleted} deleted"
+        return summary
+    
+    def merge(self, other: 'ImportStats') -> None:
+        """Add another import's counts to these."""
+        for table, count in other.rows.items():
+            self.rows[table] = self.rows.get(table, 0) + count
+        self.unchanged += other.unchanged
+        self.deleted += other.deleted
+        self.failed.extend(other.failed)
+
+# How an import writes its rows: "full" loads every row into tables the caller has emptied,
+# "incremental" only writes rows that changed since the last import, "swap" loads a new
+# copy of the tables and swaps it in for the live ones, and "character" replaces each
+# character's rows in its own transaction
+IMPORT_MODES = ('incremental', 'full', 'swap', 'character')
+
+# A character's name and the (model, column values) rows to import for them
+CharacterRows = Tuple[str, List[Tuple[Type[SQLModel], Dict[str, Any]]]]
+
+# Rows buffered per table before they are written
+BATCH_SIZE = 5000
+
+# The number given to a repeated row's key
+REPEAT_SUFFIX = re.compile(r'#(\d+)$')
+
+# Escapes for PostgreSQL's COPY text format
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+def row_key(row: Dict[str, Any]) -> str:
+    """Natural key for a row: its table type and name, and the move's input and name."""
+    parts = [row.get(field) for field in ('table_type', 'table_name', 'input', 'name')]
+    return '|'.join(' '.join(str(part).split()) for part in parts if part is not None)
+
+def row_hash(row: Dict[str, Any]) -> str:
+    """Hash of a row's column values."""
+    return hashlib.sha256(json.dumps(row, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def copy_value(value: Any) -> str:
+    """Format a value as a field in COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+class BulkLoader:
+    """Write rows to their tables in batches, bypassing the ORM.
+    
+    Rows are plain dicts of column values, turned into tuples in table
+    column order and not validated by the models. On PostgreSQL with
+    psycopg2 each batch is written with one COPY; other databases get one
+    executemany INSERT per batch. The models' default factories don't run
+    here, so timestamps are filled in by the loader, as are the row key and
+    hash that incremental imports match rows on. targets redirects a
+    model's rows to another table with the same columns.
+    """
+    
+    def __init__(
+        self,
+        connection: Connection,
+        batch_size: int = BATCH_SIZE,
+        targets: Optional[Dict[Table, Table]] = None,
+    ) -> None:
+        self.connection = connection
+        self.targets = targets or {}
+        self.batch_size = batch_size
+        self.use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+        # Naive UTC, as the models' datetime.utcnow defaults write it
+        self.now = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.columns: Dict[Table, List[Tuple[str, Any]]] = {}
+        self.pending: Dict[Table, List[Tuple[Any, ...]]] = {}
+        self.key_counts: Dict[str, int] = {}
+        self.stats = ImportStats()
+    
+    def add(self, model: Type[SQLModel], row: Dict[str, Any]) -> None:
+        table: Table = model.__table__  # type: ignore[attr-defined]
+        if 'row_key' in table.c:
+            row = self.keyed(row)
+        self.write(self.targets.get(table, table), row)
     
-    # Create a new dict with mapped field names
-    mapped_data: Dict[str, Any] = {}
-    for key, value in data.items():
-        mapped_key = field_mapping.get(key, key.lower().replace(' ', '_'))
+    def keyed(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """The row with its key and content hash added."""
+        key = row_key(row)
+        count = self.key_counts[key] = self.key_counts.get(key, 0) + 1
+        if count > 1:
+            key = f"{key}#{count}"  # repeated rows are told apart by their order
+        return {**row, 'row_key': key, 'row_hash': row_hash(row)}
+    
+    def count_keys(self, keys: Iterable[str]) -> None:
+        """Count keys that are already stored, so repeated rows are numbered after them."""
+        for key in keys:
+            match = REPEAT_SUFFIX.search(key)
+            base, count = (key[:match.start()], int(match.group(1))) if match else (key, 1)
+            self.key_counts[base] = max(self.key_counts.get(base, 0), count)
+    
+    def timestamp(self, column: Column) -> datetime:
+        """The import time for a timestamp column, made aware only if the column stores a time zone."""
+        return self.now.replace(tzinfo=timezone.utc) if getattr(column.type, 'timezone', False) else self.now
+    
+    def write(self, table: Table, row: Dict[str, Any]) -> None:
+        columns = self.columns.get(table)
+        if columns is None:
+            # Every column but the generated id, with the default used when a row leaves it out
+            columns = self.columns[table] = [
+                (column.name, self.timestamp(column) if column.name in ('created_at', 'updated_at') else None)
+                for column in table.columns if not column.primary_key
+            ]
+            self.pending[table] = []
         
-        # For move fields in GatlingTable and NormalMoves, split into list
-        if mapped_key in {'p_moves', 'k_moves', 's_moves', 'h_moves', 'd_moves', 'cancel_options'}:
-            # Handle empty strings and None values
-            if not value:
-                mapped_data[mapped_key] = []
-            else:
-                # Split by comma and strip whitespace, filter out empty strings
-                moves = [move.strip() for move in value.split(',') if move.strip()]
-                mapped_data[mapped_key] = moves
+        batch = self.pending[table]
+        batch.append(tuple(row.get(name, default) for name, default in columns))
+        if len(batch) >= self.batch_size:
+            self.flush(table)
+    
+    def flush(self, table: Table) -> None:
+        batch = self.pending[table]
+        if not batch:
+            return
+        names = [name for name, _ in self.columns[table]]
+        self.write_batch(table, names, batch)
+        self.stats.rows[table.name] = self.stats.rows.get(table.name, 0) + len(batch)
+        self.pending[table] = []
+    
+    def write_batch(self, table: Table, names: List[str], batch: List[Tuple[Any, ...]]) -> None:
+        if self.use_copy:
+            preparer = self.connection.dialect.identifier_preparer
+            data = ''.join('\t'.join(map(copy_value, row)) + '\n' for row in batch)
+            cursor = self.connection.connection.cursor()
+            cursor.copy_expert(  # type: ignore[attr-defined]
+                f"COPY {preparer.format_table(table)} ({', '.join(map(preparer.quote, names))}) FROM STDIN",
+                io.StringIO(data),
+            )
         else:
-            mapped_data[mapped_key] = value
+            self.connection.execute(insert(table), [dict(zip(names, row)) for row in batch])
     
-    return model_class(**mapped_data)
+    def finish(self) -> ImportStats:
+        """Write any rows still buffered and return the import's stats."""
+        for table in self.pending:
+            self.flush(table)
+        self.stats.elapsed = time.perf_counter() - self.stats.started
+        return self.stats
 
-def create_character_record(session: Session, character_slug: str) -> Character:
-    """Create or update a character record."""
-    # Convert slug to display name (e.g., 'Sol_Badguy' -> 'Sol Badguy')
-    display_name = character_slug.replace('_', ' ')
+class UpsertLoader(BulkLoader):
+    """Write only the rows that differ from what the database already holds.
+    
+    Rows are matched on their row key. Rows whose hash is unchanged are
+    skipped, and new or changed rows are written with INSERT ... ON
+    CONFLICT DO UPDATE. On finish, rows of the imported table types that
+    weren't seen are deleted, along with rows imported before row keys
+    existed. Characters are only ever added.
+    """
+    
+    def __init__(self, connection: Connection, table_types: Dict[Type[SQLModel], str], batch_size: int = BATCH_SIZE) -> None:
+        super().__init__(connection, batch_size)
+        if connection.dialect.name == 'postgresql':
+            self.insert = postgresql.insert
+        elif connection.dialect.name == 'sqlite':
+            self.insert = sqlite.insert
+        else:
+            raise ValueError(f"Incremental imports need PostgreSQL or SQLite, not {connection.dialect.name}")
+        self.use_copy = False
+        self.table_types: Dict[Table, str] = {model.__table__: table_type for model, table_type in table_types.items()}  # type: ignore[attr-defined]
+        self.existing: Dict[Table, Dict[str, str]] = {}
+        self.seen: Dict[Table, Set[str]] = {table: set() for table in self.table_types}
+        self.slugs: Optional[Set[str]] = None
+    
+    def existing_rows(self, table: Table) -> Dict[str, str]:
+        """Hash of every keyed row of this import's table type, by row key."""
+        if table not in self.existing:
+            rows = self.connection.execute(
+                select(table.c.row_key, table.c.row_hash)
+                .where(table.c.table_type == self.table_types[table], table.c.row_key.is_not(None))
+            )
+            self.existing[table] = {key: digest for key, digest in rows}
+        return self.existing[table]
     
-    # Check if character already exists
-    stmt = select(Character).where(Character.slug == character_slug)
-    character = session.exec(stmt).first()
+    def add(self, model: Type[SQLModel], row: Dict[str, Any]) -> None:
+        table: Table = model.__table__  # type: ignore[attr-defined]
+        if 'row_key' not in table.c:
+            if self.slugs is None:
+                self.slugs = set(self.connection.execute(select(Character.__table__.c.slug)).scalars())  # type: ignore[attr-defined]
+            if row['slug'] not in self.slugs:
+                self.slugs.add(row['slug'])
+                self.write(table, row)
+            return
+        
+        row = self.keyed(row)
+        self.seen[table].add(row['row_key'])
+        if self.existing_rows(table).get(row['row_key']) == row['row_hash']:
+            self.stats.unchanged += 1
+        else:
+            self.write(table, row)
     
-    if character is None:
-        # Create new character record
-        character = Character(
-            name=character_slug,
-            slug=character_slug,
-            display_name=display_name
+    def write_batch(self, table: Table, names: List[str], batch: List[Tuple[Any, ...]]) -> None:
+        if 'row_key' not in table.c:
+            super().write_batch(table, names, batch)
+            return
+        statement = self.insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.row_key],
+            set_={name: statement.excluded[name] for name in names if name != 'created_at'},
         )
-        session.add(character)
-        session.flush()  # Get the ID without committing
+        self.connection.execute(statement, [dict(zip(names, row)) for row in batch])
     
-    return character
+    def finish(self) -> ImportStats:
+        for table in self.pending:
+            self.flush(table)
+        
+        # Remove rows that are no longer in the input
+        for table, table_type in self.table_types.items():
+            vanished = [key for key in self.existing_rows(table) if key not in self.seen[table]]
+            for i in range(0, len(vanished), self.batch_size):
+                result = self.connection.execute(delete(table).where(table.c.row_key.in_(vanished[i:i + self.batch_size])))
+                self.stats.deleted += result.rowcount
+            result = self.connection.execute(delete(table).where(table.c.table_type == table_type, table.c.row_key.is_(None)))
+            self.stats.deleted += result.rowcount
+        
+        self.stats.elapsed = time.perf_counter() - self.stats.started
+        return self.stats
+
+def create_loader(connection: Connection, mode: str, table_types: Dict[Type[SQLModel], str]) -> BulkLoader:
+    """The loader that writes rows for a full or incremental import."""
+    if mode == 'incremental':
+        return UpsertLoader(connection, table_types)
+    return BulkLoader(connection)
 
-def import_json_to_db(json_path: Path, database_url: str | None = None) -> None:
-    """Import frame data from cleaned JSON into the database."""
+# Tables a full or swap import replaces, in the order the CLI truncates them
+IMPORT_TABLES: List[Type[SQLModel]] = [
+    NormalMoves, SpecialMoves, OverdriveMoves, SystemCoreData, SystemJumpData,
+    GatlingTable, CharacterSpecificTable, Character,
+]
+
+# Schemas a swap import loads into and moves the replaced tables to
+STAGING_SCHEMA = 'frame_data_staging'
+RETIRED_SCHEMA = 'frame_data_retired'
+
+def swap_import(
+    engine: Engine,
+    characters: Iterable[CharacterRows],
+    lock_timeout: str = '2s',
+    swap_retries: int = 5,
+) -> ImportStats:
+    """Load into staging tables, then swap them in for the live tables in one short transaction.
+    
+    The staging tables are created without indexes and bulk loaded. Then
+    they are indexed and analyzed. Moving tables between schemas only
+    needs brief locks, so readers keep using the old tables until the swap
+    commits and then see the whole new roster. If the locks aren't granted
+    within lock_timeout, the swap backs off and tries again rather than
+    queueing readers behind it.
+    """
+    if engine.dialect.name != 'postgresql':
+        raise ValueError(f"Swap imports need PostgreSQL, not {engine.dialect.name}")
+    quote = engine.dialect.identifier_preparer.quote
+    metadata = MetaData()
+    staged: List[Tuple[Table, List[Index]]] = []
+    
+    with engine.begin() as connection:
+        live_schema = connection.execute(text("SELECT current_schema()")).scalar_one()
+        for schema in (STAGING_SCHEMA, RETIRED_SCHEMA):
+            connection.execute(text(f"DROP SCHEMA IF EXISTS {quote(schema)} CASCADE"))
+            connection.execute(text(f"CREATE SCHEMA {quote(schema)}"))
+        for model in IMPORT_TABLES:
+            live: Table = model.__table__  # type: ignore[attr-defined]
+            table = live.to_metadata(metadata, schema=STAGING_SCHEMA)
+            table.indexes.clear()  # built once the rows are in
+            table.create(connection)
+            # Named like the live indexes, which the staged ones replace
+            indexes = [
+                Index(index.name, *(table.c[column.name] for column in index.columns), unique=index.unique)
+                for index in live.indexes
+            ]
+            staged.append((table, indexes))
+    
+    with engine.begin() as connection:
+        loader = BulkLoader(connection, targets={
+            model.__table__: table for model, (table, _) in zip(IMPORT_TABLES, staged)  # type: ignore[attr-defined]
+        })
+        for _, rows in characters:
+            for model, row in rows:
+                loader.add(model, row)
+        stats = loader.finish()
+        for table, indexes in staged:
+            for index in indexes:
+                index.create(connection)
+            connection.execute(text(f"ANALYZE {quote(STAGING_SCHEMA)}.{quote(table.name)}"))
+    
+    for attempt in range(swap_retries + 1):
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f"SET LOCAL lock_timeout = '{lock_timeout}'"))
+                for table, _ in staged:
+                    name = quote(table.name)
+                    connection.execute(text(f"ALTER TABLE {quote(live_schema)}.{name} SET SCHEMA {quote(RETIRED_SCHEMA)}"))
+                    connection.execute(text(f"ALTER TABLE {quote(STAGING_SCHEMA)}.{name} SET SCHEMA {quote(live_schema)}"))
+            break
+        except OperationalError as e:
+            if attempt == swap_retries:
+                raise
+            print(f"[yellow]Tables are busy, retrying the swap: {str(e).splitlines()[0]}[/yellow]")
+            time.sleep(0.5 * 2 ** attempt)
+    
+    with engine.begin() as connection:
+        for schema in (STAGING_SCHEMA, RETIRED_SCHEMA):
+            connection.execute(text(f"DROP SCHEMA {quote(schema)} CASCADE"))
+    
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+def advisory_lock_key(char_name: str) -> int:
+    """The PostgreSQL advisory lock key guarding a character's rows."""
+    digest = hashlib.sha256(f"frame_data:{char_name}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+def replace_character(
+    engine: Engine,
+    table_types: Dict[Type[SQLModel], str],
+    character: CharacterRows,
+    replace: bool = True,
+) -> ImportStats:
+    """Replace one character's rows in all of the import's tables in a single transaction.
+    
+    With replace off the rows are added to the character's existing ones.
+    On PostgreSQL the transaction first takes the character's advisory
+    lock, so two imports of the same character run one after the other
+    while imports of other characters go ahead.
+    """
+    char_name, rows = character
+    characters: Table = Character.__table__  # type: ignore[attr-defined]
+    with engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': advisory_lock_key(char_name)})
+        
+        loader = BulkLoader(connection)
+        for model, table_type in table_types.items():
+            table: Table = model.__table__  # type: ignore[attr-defined]
+            rows_of_character = (table.c.character == char_name, table.c.table_type == table_type)
+            if replace:
+                result = connection.execute(delete(table).where(*rows_of_character))
+                loader.stats.deleted += result.rowcount
+            elif 'row_key' in table.c:
+                # Rows added to an earlier part of the character's rows carry on its numbering
+                keys = connection.execute(select(table.c.row_key).where(*rows_of_character, table.c.row_key.is_not(None)))
+                loader.count_keys(keys.scalars())
+        for model, row in rows:
+            if model is Character and connection.execute(select(characters.c.id).where(characters.c.slug == row['slug'])).first():
+                continue  # characters are only ever added
+            loader.add(model, row)
+        return loader.finish()
+
+def character_import(
+    engine: Engine,
+    table_types: Dict[Type[SQLModel], str],
+    characters: Iterable[CharacterRows],
+    jobs: int = 4,
+) -> ImportStats:
+    """Replace each character's rows in its own transaction, jobs characters at a time.
+    
+    A character that fails to import is rolled back on its own and listed
+    in the stats. Characters are imported one at a time on databases other
+    than PostgreSQL, which have no advisory locks and serialize writers
+    anyway.
+    """
+    stats = ImportStats()
+    if engine.dialect.name != 'postgresql':
+        jobs = 1
+    
+    def replace(character: CharacterRows, previous: Optional["Future[ImportStats]"]) -> ImportStats:
+        try:
+            # A later run of the same character's rows adds to the first once it's in
+            if previous is not None and character[0] in previous.result().failed:
+                raise ValueError("an earlier part of their rows failed to import")
+            return replace_character(engine, table_types, character, replace=previous is None)
+        except Exception as e:
+            print(f"[red]Failed to import {character[0]}: {str(e)}[/red]")
+            failed = ImportStats()
+            failed.failed.append(character[0])
+            return failed
+    
+    # Only a few characters are read ahead of the workers, so memory doesn't grow with the roster
+    started: Dict[str, "Future[ImportStats]"] = {}
+    pending: Deque["Future[ImportStats]"] = deque()
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        for character in characters:
+            future = executor.submit(replace, character, started.get(character[0]))
+            started[character[0]] = future
+            pending.append(future)
+            if len(pending) >= 2 * max(jobs, 1):
+                stats.merge(pending.popleft().result())
+        while pending:
+            stats.merge(pending.popleft().result())
+    
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+def run_import(
+    engine: Engine,
+    mode: str,
+    table_types: Dict[Type[SQLModel], str],
+    characters: Iterable[CharacterRows],
+    jobs: int = 4,
+    only: Optional[List[str]] = None,
+) -> ImportStats:
+    """Write each character's rows using one of IMPORT_MODES.
+    
+    only limits a character import to the named characters, leaving
+    everyone else's rows alone.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Unknown import mode '{mode}', choose from: {', '.join(IMPORT_MODES)}")
+    if only and mode != 'character':
+        raise ValueError("Importing only some characters needs the character import mode")
+    if mode == 'swap':
+        return swap_import(engine, characters)
+    if mode == 'character':
+        if only:
+            names = {name.lower() for name in only}
+            characters = (character for character in characters if character[0].lower() in names)
+        return character_import(engine, table_types, characters, jobs)
+    
+    with engine.begin() as connection:
+        loader = create_loader(connection, mode, table_types)
+        for _, rows in characters:
+            for model, row in rows:
+                loader.add(model, row)
+        return loader.finish()
+
+def character_row(char_name: str) -> Dict[str, Any]:
+    """Column values for a character's record."""
+    return {
+        'name': char_name,
+        'slug': char_name.lower().replace(' ', '_'),
+        'display_name': char_name,
+    }
+
+# Parsed frame data tables: model, table name suffix, fields copied as they are,
+# and fields stored as text. input (and name where the model has one) are required.
+PARSED_TABLES: Dict[str, Tuple[Type[SQLModel], str, List[str], List[str]]] = {
+    'normal_moves': (
+        NormalMoves, "Normal Moves",
+        ['guard', 'counter_type', 'invuln'],
+        ['damage', 'startup', 'active', 'recovery', 'on_block', 'on_hit', 'level', 'proration', 'risc_gain', 'risc_loss'],
+    ),
+    'special_moves': (
+        SpecialMoves, "Special Moves",
+        ['guard', 'counter_type', 'invuln'],
+        ['damage', 'startup', 'active', 'recovery', 'on_block', 'on_hit', 'level', 'proration', 'risc_gain', 'risc_loss',
+         'tension_cost'],
+    ),
+    'overdrive_moves': (
+        OverdriveMoves, "Overdrive Moves",
+        ['guard', 'counter_type', 'invuln'],
+        ['damage', 'startup', 'active', 'recovery', 'on_block', 'on_hit', 'level', 'proration', 'risc_gain', 'risc_loss',
+         'tension_cost', 'tension_gain'],
+    ),
+    'system_core': (
+        SystemCoreData, "System Core",
+        ['unique_movement_options'],
+        ['defense', 'guts', 'risc_gain_modifier', 'prejump', 'backdash_duration', 'backdash_invuln', 'backdash_airborne',
+         'forward_dash', 'movement_tension_gain', 'weight', 'ground_throw_range', 'air_throw_range', 'throw_hurt_box'],
+    ),
+    'system_jump': (
+        SystemJumpData, "System Jump",
+        ['air_movement_options'],
+        ['jump_duration', 'high_jump_duration', 'jump_height', 'high_jump_height', 'pre_instant_air_dash',
+         'air_dash_duration', 'air_backdash_duration', 'air_dash_distance', 'air_backdash_distance',
+         'jumping_tension_gain', 'air_dash_tension_gain', 'double_jump_height', 'double_jump_duration'],
+    ),
+}
+
+def parsed_row(char_name: str, table_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one row of a character's parsed frame data."""
+    model, suffix, fields, text_fields = PARSED_TABLES[table_type]
+    row = {'character': char_name, 'table_name': f"{char_name} {suffix}", 'table_type': table_type}
+    if table_type.endswith('_moves'):
+        row['input'] = data['input']
+        if 'name' in model.model_fields:
+            row['name'] = data['name']
+    for field in fields:
+        row[field] = data.get(field)
+    for field in text_fields:
+        # Blank cells are normalized to None but have always been stored as empty text
+        value = data.get(field)
+        row[field] = '' if value is None else str(value)
+    return row
+
+# Table for each cargoquery move type
+API_TYPES = {
+    'normal': 'normal_moves',
+    'special': 'special_moves',
+    'overdrive': 'overdrive_moves',
+    'super': 'overdrive_moves',
+    'system_core': 'system_core',
+    'system_jump': 'system_jump',
+    'gatling': 'gatling_tables',
+}
+
+# API tables that are imported: model, table name suffix, table type and column -> API field
+MOVE_API_FIELDS = {
+    'input': 'input', 'damage': 'damage', 'guard': 'guard', 'startup': 'startup', 'active': 'active',
+    'recovery': 'recovery', 'on_block': 'onBlock', 'on_hit': 'onHit', 'level': 'level', 'counter_type': 'counter',
+    'risc_gain': 'riscGain', 'risc_loss': 'riscLoss', 'proration': 'prorate', 'notes': 'notes',
+}
+API_TABLES: Dict[str, Tuple[Type[SQLModel], str, str, Dict[str, str]]] = {
+    'normal_moves': (NormalMoves, "Normal Moves", "normal", MOVE_API_FIELDS),
+    'special_moves': (SpecialMoves, "Special Moves", "special", MOVE_API_FIELDS),
+    'overdrive_moves': (OverdriveMoves, "Overdrive Moves", "overdrive", {**MOVE_API_FIELDS, 'tension_gain': 'inputTension'}),
+    'system_core': (SystemCoreData, "System Core", "system_core", {
+        'defense': 'defense', 'guts': 'guts', 'risc_gain_modifier': 'riscGain', 'prejump': 'prejump',
+        'backdash_duration': 'backdash_duration', 'backdash_invuln': 'invuln', 'backdash_airborne': 'backdash_airborne',
+        'forward_dash': 'forward_dash', 'unique_movement_options': 'notes', 'movement_tension_gain': 'inputTension',
+    }),
+    'system_jump': (SystemJumpData, "System Jump", "system_jump", {
+        field: field for field in [
+            'jump_duration', 'high_jump_duration', 'jump_height', 'high_jump_height', 'pre_instant_air_dash',
+            'air_dash_duration', 'air_backdash_duration', 'air_dash_distance', 'air_backdash_distance',
+            'jumping_tension_gain', 'air_dash_tension_gain',
+        ]
+    }),
+    'character_specific': (CharacterSpecificTable, "", "character_specific", {}),
+}
+
+# Names for moves the API leaves unnamed
+API_FALLBACK_NAMES = {
+    'special_moves': "Special Move",
+    'overdrive_moves': "Overdrive",
+}
+
+def api_row(char_name: str, table: str, move: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for one cargoquery move."""
+    model, suffix, table_type, fields = API_TABLES[table]
+    row = {'character': char_name, 'table_name': f"{char_name} {suffix}", 'table_type': table_type}
+    for column, field in fields.items():
+        row[column] = move.get(field)
+    if table in API_FALLBACK_NAMES:
+        # If name is null, use the input as the name
+        row['name'] = move.get('name') or f"{API_FALLBACK_NAMES[table]} {move.get('input')}"
+    elif table == 'character_specific':
+        row['table_name'] = f"{char_name} {move.get('name', 'Special Data')}"
+        row['headers'] = []  # You'll need to determine how to extract headers
+        row['rows'] = [move]  # Store the raw data for now
+    return row
+
+def parsed_character(char_data: Dict[str, Any]) -> CharacterRows:
+    """A character's rows from parsed frame data."""
+    char_name = char_data['name']
+    rows: List[Tuple[Type[SQLModel], Dict[str, Any]]] = [(Character, character_row(char_name))]
+    for table_type, (model, *_) in PARSED_TABLES.items():
+        rows.extend((model, parsed_row(char_name, table_type, row)) for row in char_data[table_type])
+    return char_name, rows
+
+def import_json_to_db(
+    json_path: Path,
+    database_url: str | None = None,
+    mode: str = 'full',
+    jobs: int = 4,
+    only: Optional[List[str]] = None,
+) -> ImportStats:
+    """Import frame data from cleaned JSON into the database using one of IMPORT_MODES."""
     if database_url is None:
         database_url = get_database_url()
     
-    engine = create_engine(database_url)
+    engine = create_engine(database_url, pool_size=max(jobs, 5))
     
     try:
-        # Read the JSON data
+        # Characters are read from the file one at a time as they are written
+        table_types = {model: table_type for table_type, (model, *_) in PARSED_TABLES.items()}
         with open(json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        with Session(engine) as session:
-            # Process each character
-            for char_data in data['characters']:
-                # Create character record
-                char_name = char_data['name']
-                char = Character(
-                    name=char_name,
-                    slug=char_name.lower().replace(' ', '_'),
-                    display_name=char_name,
-                )
-                session.add(char)
-                session.flush()  # Get the character ID
-                
-                # Import normal moves
-                for move in char_data['normal_moves']:
-                    normal = NormalMoves(
-                        character=char_name,
-                        table_name=f"{char_name} Normal Moves",
-                        table_type="normal_moves",
-                        input=move['input'],
-                        damage=str(move.get('damage', '')),
-                        guard=move.get('guard'),
-                        startup=str(move.get('startup', '')),
-                        active=str(move.get('active', '')),
-                        recovery=str(move.get('recovery', '')),
-                        on_block=str(move.get('on_block', '')),
-                        on_hit=str(move.get('on_hit', '')),
-                        level=str(move.get('level', '')),
-                        counter_type=move.get('counter_type'),
-                        invuln=move.get('invuln'),
-                        proration=str(move.get('proration', '')),
-                        risc_gain=str(move.get('risc_gain', '')),
-                        risc_loss=str(move.get('risc_loss', '')),
-                    )
-                    session.add(normal)
-                
-                # Import special moves
-                for move in char_data['special_moves']:
-                    special = SpecialMoves(
-                        character=char_name,
-                        table_name=f"{char_name} Special Moves",
-                        table_type="special_moves",
-                        name=move['name'],
-                        input=move['input'],
-                        damage=str(move.get('damage', '')),
-                        guard=move.get('guard'),
-                        startup=str(move.get('startup', '')),
-                        active=str(move.get('active', '')),
-                        recovery=str(move.get('recovery', '')),
-                        on_block=str(move.get('on_block', '')),
-                        on_hit=str(move.get('on_hit', '')),
-                        level=str(move.get('level', '')),
-                        counter_type=move.get('counter_type'),
-                        invuln=move.get('invuln'),
-                        proration=str(move.get('proration', '')),
-                        risc_gain=str(move.get('risc_gain', '')),
-                        risc_loss=str(move.get('risc_loss', '')),
-                        tension_cost=str(move.get('tension_cost', '')),
-                    )
-                    session.add(special)
-                
-                # Import overdrive moves
-                for move in char_data['overdrive_moves']:
-                    overdrive = OverdriveMoves(
-                        character=char_name,
-                        table_name=f"{char_name} Overdrive Moves",
-                        table_type="overdrive_moves",
-                        name=move['name'],
-                        input=move['input'],
-                        damage=str(move.get('damage', '')),
-                        guard=move.get('guard'),
-                        startup=str(move.get('startup', '')),
-                        active=str(move.get('active', '')),
-                        recovery=str(move.get('recovery', '')),
-                        on_block=str(move.get('on_block', '')),
-                        on_hit=str(move.get('on_hit', '')),
-                        level=str(move.get('level', '')),
-                        counter_type=move.get('counter_type'),
-                        invuln=move.get('invuln'),
-                        proration=str(move.get('proration', '')),
-                        risc_gain=str(move.get('risc_gain', '')),
-                        risc_loss=str(move.get('risc_loss', '')),
-                        tension_cost=str(move.get('tension_cost', '')),
-                        tension_gain=str(move.get('tension_gain', '')),
-                    )
-                    session.add(overdrive)
-                
-                # Import system core data
-                for core_data in char_data['system_core']:
-                    core = SystemCoreData(
-                        character=char_name,
-                        table_name=f"{char_name} System Core",
-                        table_type="system_core",
-                        defense=str(core_data.get('defense', '')),
-                        guts=str(core_data.get('guts', '')),
-                        risc_gain_modifier=str(core_data.get('risc_gain_modifier', '')),
-                        prejump=str(core_data.get('prejump', '')),
-                        backdash_duration=str(core_data.get('backdash_duration', '')),
-                        backdash_invuln=str(core_data.get('backdash_invuln', '')),
-                        backdash_airborne=str(core_data.get('backdash_airborne', '')),
-                        forward_dash=str(core_data.get('forward_dash', '')),
-                        unique_movement_options=core_data.get('unique_movement_options'),
-                        movement_tension_gain=str(core_data.get('movement_tension_gain', '')),
-                        weight=str(core_data.get('weight', '')),
-                        ground_throw_range=str(core_data.get('ground_throw_range', '')),
-                        air_throw_range=str(core_data.get('air_throw_range', '')),
-                        throw_hurt_box=str(core_data.get('throw_hurt_box', '')),
-                    )
-                    session.add(core)
-                
-                # Import system jump data
-                for jump_data in char_data['system_jump']:
-                    jump = SystemJumpData(
-                        character=char_name,
-                        table_name=f"{char_name} System Jump",
-                        table_type="system_jump",
-                        jump_duration=str(jump_data.get('jump_duration', '')),
-                        high_jump_duration=str(jump_data.get('high_jump_duration', '')),
-                        jump_height=str(jump_data.get('jump_height', '')),
-                        high_jump_height=str(jump_data.get('high_jump_height', '')),
-                        pre_instant_air_dash=str(jump_data.get('pre_instant_air_dash', '')),
-                        air_dash_duration=str(jump_data.get('air_dash_duration', '')),
-                        air_backdash_duration=str(jump_data.get('air_backdash_duration', '')),
-                        air_dash_distance=str(jump_data.get('air_dash_distance', '')),
-                        air_backdash_distance=str(jump_data.get('air_backdash_distance', '')),
-                        jumping_tension_gain=str(jump_data.get('jumping_tension_gain', '')),
-                        air_dash_tension_gain=str(jump_data.get('air_dash_tension_gain', '')),
-                        double_jump_height=str(jump_data.get('double_jump_height', '')),
-                        double_jump_duration=str(jump_data.get('double_jump_duration', '')),
-                        air_movement_options=jump_data.get('air_movement_options'),
-                    )
-                    session.add(jump)
-            
-            # Commit all changes
-            session.commit()
+            return run_import(engine, mode, table_types, map(parsed_character, iter_json_array(f, 'characters')), jobs, only)
     
     except json.JSONDecodeError as e:
         raise ValueError(f"Failed to parse JSON file {json_path}: {str(e)}")
     except Exception as e:
-        raise ValueError(f"Failed to import data: {str(e)}") 
\ No newline at end of file
+        raise ValueError(f"Failed to import data: {str(e)}")
+
+def api_table(move: Dict[str, Any]) -> str:
+    """The table a cargoquery move belongs in."""
+    move_type = (move.get('type') or '').lower()
+    table = API_TYPES.get(move_type)
+    if table is None:
+        # Log unknown types for debugging
+        print(f"[yellow]Unknown move type '{move_type}' for {move['chara']}'s move: {move.get('name', move.get('input'))}[/yellow]")
+        table = 'character_specific'
+    return table
+
+def api_characters(entries: Iterable[Dict[str, Any]]) -> Iterator[CharacterRows]:
+    """Each character's rows from a stream of cargoquery entries.
+    
+    Consecutive entries for the same character are grouped together, so
+    only one character's moves are held at a time. A character whose
+    entries are split up comes back once per run of entries, with their
+    record only in the first.
+    """
+    seen: Set[str] = set()
+    moves = (entry['title'] for entry in entries)
+    for char_name, char_moves in itertools.groupby(moves, key=lambda move: move['chara']):
+        rows: List[Tuple[Type[SQLModel], Dict[str, Any]]] = [] if char_name in seen else [(Character, character_row(char_name))]
+        seen.add(char_name)
+        for move in char_moves:
+            table = api_table(move)
+            if table in API_TABLES:
+                rows.append((API_TABLES[table][0], api_row(char_name, table, move)))
+        yield char_name, rows
+
+def import_api_json_to_db(
+    json_path: Path,
+    database_url: str | None = None,
+    mode: str = 'full',
+    jobs: int = 4,
+    only: Optional[List[str]] = None,
+) -> ImportStats:
+    """Import move data downloaded from the Dustloop API into the database using one of IMPORT_MODES."""
+    if database_url is None:
+        database_url = get_database_url()
+    
+    engine = create_engine(database_url, pool_size=max(jobs, 5))
+    
+    table_types = {model: table_type for model, _, table_type, _ in API_TABLES.values()}
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return run_import(engine, mode, table_types, api_characters(iter_json_array(f, 'cargoquery')), jobs, only)
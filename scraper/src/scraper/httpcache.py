@@ -0,0 +1,159 @@
+from email.utils import formatdate
+from pathlib import Path
+from time import time
+from typing import Any, Optional, Union
+import json
+import logging
+import sqlite3
+import zlib
+from scrapy import Spider
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
+from scrapy.extensions.httpcache import RFC2616Policy, rfc1123_to_epoch
+from scrapy.http import Headers, Request, Response
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+
+class RevalidatingCachePolicy(RFC2616Policy):
+    """Keep every page cached, but check it with the server on each crawl.
+
+    Cached pages are sent back as conditional requests using their stored
+    ETag and Last-Modified headers. A 304 answer serves the cached copy,
+    flagged as "revalidated", with its Date and validators taken from the
+    304. HTTPCACHE_REVALIDATE_AFTER trusts cached pages without asking for
+    that many seconds after they were last fetched or revalidated.
+    """
+
+    def __init__(self, settings: Any) -> None:
+        super().__init__(settings)
+        self.revalidate_after = settings.getint('HTTPCACHE_REVALIDATE_AFTER', 0)
+
+    def should_cache_response(self, response: Response, request: Request) -> bool:
+        # Store every successful page; ones without validators are simply refetched
+        if response.status == 200:
+            return True
+        return super().should_cache_response(response, request)
+
+    def is_cached_response_fresh(self, cachedresponse: Response, request: Request) -> bool:
+        if self.revalidate_after:
+            fetched_at = rfc1123_to_epoch(cachedresponse.headers.get(b'Date'))
+            if fetched_at is not None and time() - fetched_at < self.revalidate_after:
+                return True
+
+        if b'ETag' in cachedresponse.headers:
+            request.headers[b'If-None-Match'] = cachedresponse.headers[b'ETag']
+        if b'Last-Modified' in cachedresponse.headers:
+            request.headers[b'If-Modified-Since'] = cachedresponse.headers[b'Last-Modified']
+        return False
+
+    def is_cached_response_valid(self, cachedresponse: Response, response: Response, request: Request) -> bool:
+        if response.status == 304:
+            cachedresponse.flags.append('revalidated')
+            # The page's age restarts from the revalidation
+            cachedresponse.headers[b'Date'] = response.headers.get(b'Date') or formatdate(usegmt=True)
+            for header in (b'ETag', b'Last-Modified'):
+                if header in response.headers:
+                    cachedresponse.headers[header] = response.headers[header]
+            return True
+        return super().is_cached_response_valid(cachedresponse, response, request)
+
+class RevalidatingCacheMiddleware(HttpCacheMiddleware):
+    """Store cached pages again when the server confirms them with a 304.
+
+    This keeps the Date refreshed by RevalidatingCachePolicy for later
+    crawls. Scrapy releases that store revalidated pages themselves are
+    left to do so.
+    """
+
+    stores_revalidated = hasattr(HttpCacheMiddleware, '_freshen_cached_response')
+
+    def process_response(self, request: Request, response: Response, spider: Optional[Spider] = None) -> Union[Request, Response]:
+        cachedresponse = request.meta.get('cached_response')
+        if spider is None:
+            result = super().process_response(request, response)
+        else:
+            result = super().process_response(request, response, spider)
+        if not self.stores_revalidated and response.status == 304 and result is cachedresponse:
+            self.storage.store_response(spider, request, result)
+        return result
+
+class SQLiteCacheStorage:
+    """HTTP cache storage backed by a single SQLite file.
+
+    Each response is one row keyed by request fingerprint, with the body
+    zlib-compressed, so a lookup is a single primary key read and the
+    whole cache can be copied between machines as one file.
+    """
+
+    def __init__(self, settings: Any) -> None:
+        self.cachedir = data_path(settings['HTTPCACHE_DIR'], createdir=True)
+        self.expiration_secs = settings.getint('HTTPCACHE_EXPIRATION_SECS')
+        self.compression_level = settings.getint('HTTPCACHE_SQLITE_COMPRESSION_LEVEL', 6)
+        self.db: Optional[sqlite3.Connection] = None
+
+    def open_spider(self, spider: Any) -> None:
+        dbpath = Path(self.cachedir, f'{spider.name}.sqlite3')
+        self.db = sqlite3.connect(dbpath)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' fingerprint TEXT PRIMARY KEY,'
+            ' url TEXT NOT NULL,'
+            ' status INTEGER NOT NULL,'
+            ' headers TEXT NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' timestamp REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        self.db.commit()
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        logging.debug(f"Using SQLite cache storage in {dbpath}")
+
+    def close_spider(self, spider: Any) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def retrieve_response(self, spider: Any, request: Request) -> Optional[Response]:
+        """Return response if present in cache, or None otherwise."""
+        assert self.db is not None
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+        row = self.db.execute(
+            'SELECT url, status, headers, body, timestamp FROM responses WHERE fingerprint = ?',
+            (fingerprint,),
+        ).fetchone()
+        if row is None:
+            return None  # not cached
+
+        url, status, raw_headers, body, timestamp = row
+        if 0 < self.expiration_secs < time() - timestamp:
+            return None  # expired
+
+        headers = Headers({
+            name: [value.encode('latin-1') for value in values]
+            for name, values in json.loads(raw_headers).items()
+        })
+        body = zlib.decompress(body)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider: Any, request: Request, response: Response) -> None:
+        """Store the given response in the cache."""
+        assert self.db is not None
+        fingerprint = self._fingerprinter.fingerprint(request).hex()
+        headers = {
+            name.decode('latin-1'): [value.decode('latin-1') for value in values]
+            for name, values in response.headers.items()
+        }
+        self.db.execute(
+            'INSERT OR REPLACE INTO responses (fingerprint, url, status, headers, body, timestamp) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                fingerprint,
+                response.url,
+                response.status,
+                json.dumps(headers),
+                zlib.compress(response.body, self.compression_level),
+                time(),
+            ),
+        )
+        self.db.commit()
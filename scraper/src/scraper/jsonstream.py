@@ -0,0 +1,93 @@
+import json
+import re
+from typing import Any, Iterator, TextIO
+
+WHITESPACE = re.compile(r'\s*')
+# What can follow a complete value inside an object or array
+DELIMITERS = frozenset(' \t\n\r,:]}')
+DECODER = json.JSONDecoder()
+
+class JSONStream:
+    """Decode JSON values one at a time from a file, reading it in chunks.
+
+    Only the unread part of the current chunk and the value being decoded
+    are held in memory.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = 1 << 16) -> None:
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read the next chunk, dropping what has been consumed; False at the end of the file."""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self.buffer, self.pos)
+
+    def peek(self) -> str:
+        """The next character that isn't whitespace, without consuming it."""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()  # type: ignore[union-attr]
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise self.error("Unexpected end of JSON")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next value, reading more of the file until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+                # A number cut off by the end of the buffer may carry on in the next chunk
+                if self.eof or end < len(self.buffer) and self.buffer[end] in DELIMITERS:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+def iter_json_array(file: TextIO, key: str, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the items of the array under a top-level key of a JSON object, one at a time.
+
+    Other top-level values are decoded whole and skipped, so memory is
+    bounded by the largest single item rather than the whole document.
+    """
+    stream = JSONStream(file, chunk_size)
+    stream.expect('{')
+    if stream.peek() == '}':
+        raise KeyError(key)
+    while True:
+        name = stream.value()
+        stream.expect(':')
+        if name == key:
+            break
+        stream.value()
+        if stream.peek() == '}':
+            raise KeyError(key)
+        stream.expect(',')
+
+    stream.expect('[')
+    if stream.peek() == ']':
+        return
+    while True:
+        yield stream.value()
+        if stream.peek() == ']':
+            return
+        stream.expect(',')
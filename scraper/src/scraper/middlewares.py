@@ -0,0 +1,57 @@
+from typing import Any, Optional
+import logging
+from scrapy.exceptions import NotConfigured
+from scrapy.http import Request, Response
+
+class BackoffMiddleware:
+    """Slow a domain down when it answers with 429 or 503.
+
+    Multiplies the download slot's delay (or jumps to the server's
+    Retry-After) so the retried request and everything queued behind it
+    go out slower. AutoThrottle then walks the delay back down as 200s
+    come in again.
+    """
+
+    def __init__(self, crawler: Any, http_codes: list[int], factor: float, start_delay: float, max_delay: float) -> None:
+        self.crawler = crawler
+        self.http_codes = set(http_codes)
+        self.factor = factor
+        self.start_delay = start_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_crawler(cls, crawler: Any) -> 'BackoffMiddleware':
+        settings = crawler.settings
+        if not settings.getbool('BACKOFF_ENABLED'):
+            raise NotConfigured
+        return cls(
+            crawler,
+            http_codes=settings.getlist('BACKOFF_HTTP_CODES', [429, 503]),
+            factor=settings.getfloat('BACKOFF_FACTOR', 2.0),
+            start_delay=settings.getfloat('BACKOFF_START_DELAY', 1.0),
+            max_delay=settings.getfloat('BACKOFF_MAX_DELAY', 60.0),
+        )
+
+    def retry_after(self, response: Response) -> Optional[float]:
+        """Parse a Retry-After header given in seconds."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return float(value.decode('latin-1').strip())
+        except ValueError:
+            return None
+
+    def process_response(self, request: Request, response: Response, spider: Any) -> Response:
+        if response.status not in self.http_codes:
+            return response
+
+        key = request.meta.get('download_slot')
+        slot = self.crawler.engine.downloader.slots.get(key)
+        if slot is None:
+            return response
+
+        new_delay = max(slot.delay * self.factor, self.start_delay, self.retry_after(response) or 0.0)
+        slot.delay = min(new_delay, self.max_delay)
+        logging.info(f"Got {response.status} from {key}, backing off to {slot.delay:.2f}s")
+        return response
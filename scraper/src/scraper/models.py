@@ -20,6 +20,8 @@ class BaseTable(SQLModel):
     character: str = Field(index=True)
     table_name: str = Field(index=True)
     table_type: str = Field(index=True)
+    row_key: Optional[str] = Field(default=None, index=True, unique=True, description="Stable identity of the row across imports")
+    row_hash: Optional[str] = Field(default=None, description="Hash of the row's content, to skip unchanged rows on import")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,88 @@
+import html
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+# Dustloop writes R.I.S.C. with one dot leaders, which survive into the header names
+DOT_LEADER = '․'
+
+# Misspellings of column names seen in scraped or cleaned data
+COLUMN_ALIASES = {
+    'risec_gain': 'risc_gain',
+    'risk_gain': 'risc_gain',
+    'risec_loss': 'risc_loss',
+    'risk_loss': 'risc_loss',
+}
+
+# Plain integers only; signed advantage like "+2", ranges and other notation stay strings
+INTEGER = re.compile(r'-?\d+')
+
+def column_name(header: str) -> str:
+    """Map a scraped header to its schema field name."""
+    name = header.strip().lower().replace(DOT_LEADER, '').replace('.', '').replace('-', '_').replace(' ', '_')
+    return COLUMN_ALIASES.get(name, name)
+
+def clean_text(value: Any) -> Any:
+    """Strip, unescape and collapse whitespace in a cell, turning blank cells into None."""
+    if not isinstance(value, str):
+        return value
+    value = ' '.join(html.unescape(value).split())
+    return value or None
+
+def value_converter(types: List[str]) -> Callable[[Any], Any]:
+    """Build the converter for a column that allows the given JSON types."""
+    if 'integer' not in types and 'number' not in types:
+        return clean_text
+
+    def convert(value: Any) -> Any:
+        value = clean_text(value)
+        if isinstance(value, str) and INTEGER.fullmatch(value):
+            return int(value)
+        return value
+    return convert
+
+def unresolved_reasons(column: str, value: Any, properties: Dict[str, Any]) -> List[str]:
+    """Problems with a normalized, non-empty cell that the rules can't fix."""
+    if column not in properties:
+        return [f"unknown column '{column}'"]
+    if column == 'proration' and '%' not in str(value):
+        return [f"proration '{value}' has no percentage"]
+    return []
+
+def normalize_table(rows: List[Dict[str, Any]], schema: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[int, List[str]]]:
+    """Apply the mechanical cleaning rules to a table, one column at a time.
+
+    Columns are renamed to their schema fields, blank cells become None, and
+    plain numbers in integer columns become ints. Returns the normalized rows
+    and, for each row the rules couldn't fully resolve, why not.
+    """
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    properties = schema.get('properties', {})
+    normalized: List[Dict[str, Any]] = [{} for _ in rows]
+    unresolved: Dict[int, List[str]] = {}
+
+    for header in columns:
+        values = [row.get(header) for row in rows]
+        present = [header in row for row in rows]
+        name = column_name(header)
+
+        # The empty details-control column carries nothing
+        if not name and not any(clean_text(value) for value in values):
+            continue
+
+        types = properties.get(name, {}).get('type', ['string', 'null'])
+        convert = value_converter([types] if isinstance(types, str) else types)
+        for i, (value, has_value) in enumerate(zip(map(convert, values), present)):
+            if not has_value:
+                continue
+            normalized[i][name] = value
+            if value is not None:
+                reasons = unresolved_reasons(name, value, properties)
+                if reasons:
+                    unresolved.setdefault(i, []).extend(reasons)
+
+    for i, row in enumerate(normalized):
+        missing = [field for field in schema.get('required', []) if row.get(field) is None]
+        if missing:
+            unresolved.setdefault(i, []).append(f"missing required {', '.join(missing)}")
+
+    return normalized, unresolved
@@ -1,20 +1,56 @@
-from typing import Any, Dict
+from typing import IO, Any, Dict, Optional
+import gzip
 import json
 from pathlib import Path
 
 class DustloopPipeline:
-    def __init__(self) -> None:
-        self.tables: list[dict[str, Any]] = []
-        
+    """Stream scraped tables to a JSONL file, one compact record per line.
+
+    Records are flushed every few items so a crash mid-crawl leaves all
+    finished tables on disk, and memory use does not grow with the crawl.
+    """
+
+    def __init__(self, output: str = 'output/dustloop_tables.jsonl', compress: bool = False, flush_every: int = 10) -> None:
+        self.output = Path(output)
+        if compress and self.output.suffix != '.gz':
+            self.output = self.output.with_name(self.output.name + '.gz')
+        self.compress = compress
+        self.flush_every = max(1, flush_every)
+        self.file: Optional[IO[str]] = None
+        self.pending = 0
+        self.count = 0
+
+    @classmethod
+    def from_crawler(cls, crawler: Any) -> 'DustloopPipeline':
+        settings = crawler.settings
+        return cls(
+            output=settings.get('DUSTLOOP_OUTPUT', 'output/dustloop_tables.jsonl'),
+            compress=settings.getbool('DUSTLOOP_OUTPUT_GZIP', False),
+            flush_every=settings.getint('DUSTLOOP_FLUSH_EVERY', 10),
+        )
+
+    def open_spider(self, spider: Any) -> None:
+        # Create output directory if it doesn't exist
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+
+        if self.compress:
+            self.file = gzip.open(self.output, 'wt', encoding='utf-8')
+        else:
+            self.file = open(self.output, 'w', encoding='utf-8')
+
     def process_item(self, item: Dict[str, Any], spider: Any) -> Dict[str, Any]:
-        self.tables.append(dict(item))
+        assert self.file is not None
+        self.file.write(json.dumps(dict(item), ensure_ascii=False, separators=(',', ':')) + '\n')
+        self.count += 1
+        self.pending += 1
+
+        if self.pending >= self.flush_every:
+            self.file.flush()
+            self.pending = 0
         return item
-    
+
     def close_spider(self, spider: Any) -> None:
-        # Create output directory if it doesn't exist
-        output_dir = Path('output')
-        output_dir.mkdir(exist_ok=True)
-        
-        # Save all tables to a JSON file
-        with open(output_dir / 'dustloop_tables.json', 'w', encoding='utf-8') as f:
-            json.dump(self.tables, f, indent=2, ensure_ascii=False) 
\ No newline at end of file
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        spider.logger.info(f"Wrote {self.count} tables to {self.output}")
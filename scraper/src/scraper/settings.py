@@ -21,6 +21,34 @@ DOWNLOAD_DELAY = 1
 # Enable or disable downloader middlewares
 DOWNLOADER_MIDDLEWARES = {
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
+    'scraper.middlewares.BackoffMiddleware': 600,
+    'scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware': None,
+    'scraper.httpcache.RevalidatingCacheMiddleware': 900,
+}
+
+# Back off a domain on rate limiting responses (enabled by crawl profiles)
+BACKOFF_ENABLED = False
+BACKOFF_HTTP_CODES = [429, 503]
+BACKOFF_FACTOR = 2.0
+BACKOFF_START_DELAY = 1.0
+BACKOFF_MAX_DELAY = 60.0
+
+# Selectable crawl profiles, applied on top of these settings by `scrape --profile`.
+# "polite" matches the defaults above: one request at a time with a fixed delay.
+# "fast" lets AutoThrottle pick the delay from observed latency, capped per domain.
+CRAWL_PROFILES: Dict[str, Dict[str, Union[int, float, bool, List[int]]]] = {
+    'polite': {},
+    'fast': {
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 4,
+        'DOWNLOAD_DELAY': 0.05,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': 0.5,
+        'AUTOTHROTTLE_MAX_DELAY': 30.0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 4.0,
+        'BACKOFF_ENABLED': True,
+        'RETRY_TIMES': 5,
+    },
 }
 
 # Configure logging
@@ -32,12 +60,25 @@ ITEM_PIPELINES = {
     'scraper.pipelines.DustloopPipeline': 300,
 }
 
+# Stream scraped tables to JSONL, flushing every few records
+DUSTLOOP_OUTPUT = 'output/dustloop_tables.jsonl'
+DUSTLOOP_OUTPUT_GZIP = False
+DUSTLOOP_FLUSH_EVERY = 10
+
+# Per-character page and table hashes, used to skip unchanged pages on the next crawl
+DUSTLOOP_MANIFEST = 'output/dustloop_manifest.json'
+
 # Enable and configure HTTP caching
 HTTPCACHE_ENABLED = True
 HTTPCACHE_EXPIRATION_SECS = 0
 HTTPCACHE_DIR = 'httpcache'
 HTTPCACHE_IGNORE_HTTP_CODES: list[int] = []
-HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
+HTTPCACHE_STORAGE = 'scraper.httpcache.SQLiteCacheStorage'
+HTTPCACHE_SQLITE_COMPRESSION_LEVEL = 6
+
+# Revalidate cached pages with conditional requests instead of trusting them forever
+HTTPCACHE_POLICY = 'scraper.httpcache.RevalidatingCachePolicy'
+HTTPCACHE_REVALIDATE_AFTER = 0
 
 # Additional settings for better scraping
 COOKIES_ENABLED = False
@@ -1,6 +1,11 @@
+from pathlib import Path
 from typing import Any, Generator, Optional
+from urllib.parse import urlparse
+import hashlib
+import json
 import scrapy
 from scrapy.http import Response
+from lxml import etree
 import logging
 
 class DustloopSpider(scrapy.Spider):
@@ -114,13 +119,87 @@ class DustloopSpider(scrapy.Spider):
         'gatling options': 'gatling',
     }
 
-    def __init__(self, character: Optional[str] = None, *args: Any, **kwargs: Any) -> None:
+    # Table classes that can hold frame data
+    TABLE_CLASSES = ('wikitable', 'cargoTable', 'cargoDynamicTable')
+
+    # Precompiled XPath expressions for header and row extraction
+    HEADER_ROW_XPATH = etree.XPath('.//tr[1]')
+    HEADER_CELL_XPATH = etree.XPath('.//th')
+    ROW_XPATH = etree.XPath('.//tr[td]')
+    CELL_XPATH = etree.XPath('./th|./td')
+    TEXT_XPATH = etree.XPath('.//text()')
+
+    def __init__(self, character: Optional[str] = None, base_url: Optional[str] = None, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
         self.character = character
+        self._classification_cache: dict[tuple[Any, ...], Optional[tuple[str, Optional[str]]]] = {}
+        
+        # Page and table hashes from the previous crawl, loaded when DUSTLOOP_MANIFEST is set,
+        # and the directory holding each page's tables so unchanged pages can emit them again
+        self.manifest: Optional[dict[str, dict[str, Any]]] = None
+        self.manifest_path: Optional[Path] = None
+        self.tables_dir: Optional[Path] = None
+        
+        # Allow crawling a mirror or local stand-in of the wiki instead of dustloop.com
+        base_url = (base_url or 'https://www.dustloop.com').rstrip('/')
+        if base_url != 'https://www.dustloop.com':
+            self.allowed_domains = [urlparse(base_url).hostname or '']
+            self.start_urls = [f'{base_url}/w/GGST']
         
         # If character is specified, modify the start URL to go directly to frame data
         if character:
-            self.start_urls = [f'https://www.dustloop.com/w/GGST/{character}/Frame_Data']
+            self.start_urls = [f'{base_url}/w/GGST/{character}/Frame_Data']
+
+    @classmethod
+    def from_crawler(cls, crawler: Any, *args: Any, **kwargs: Any) -> 'DustloopSpider':
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        manifest_path = crawler.settings.get('DUSTLOOP_MANIFEST')
+        if manifest_path:
+            spider.load_manifest(Path(manifest_path))
+        return spider
+
+    def load_manifest(self, path: Path) -> None:
+        """Load page and table hashes recorded by the previous crawl."""
+        self.manifest_path = path
+        self.tables_dir = path.with_name(f"{path.stem}_tables")
+        self.manifest = {'pages': {}, 'tables': {}}
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                self.manifest.update(json.load(f))
+
+    def closed(self, reason: str) -> None:
+        """Persist the manifest for the next crawl."""
+        if self.manifest is None or self.manifest_path is None:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        tmp_path.replace(self.manifest_path)
+
+    def stored_tables(self, page_hash: str) -> Optional[list[dict[str, Any]]]:
+        """The tables extracted from a page the last time it had this hash, if they were kept."""
+        if self.tables_dir is None:
+            return None
+        try:
+            with open(self.tables_dir / f"{page_hash}.json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_tables(self, page_key: str, page_hash: str, tables: list[dict[str, Any]]) -> None:
+        """Keep a page's tables for the next crawl, replacing those of its previous version."""
+        if self.manifest is None or self.tables_dir is None:
+            return
+        self.tables_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.tables_dir / f"{page_hash}.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(tables, f, ensure_ascii=False, separators=(',', ':'))
+        tmp_path.replace(self.tables_dir / f"{page_hash}.json")
+
+        previous_hash = self.manifest['pages'].get(page_key)
+        if previous_hash and previous_hash != page_hash:
+            (self.tables_dir / f"{previous_hash}.json").unlink(missing_ok=True)
 
     def parse(self, response: Response) -> Generator[Any, None, None]:
         """Parse the main GGST page to get character links."""
@@ -182,131 +261,250 @@ class DustloopSpider(scrapy.Spider):
             return ''
         return value.strip()
 
+    def extract_cells(self, table: Any) -> tuple[list[str], list[int]]:
+        """Extract the text of every cell in a table's data rows in one pass.
+        
+        Row header cells are kept so that cell positions line up with the
+        header row. Returns a flat list of cell texts in row order and a list
+        of row offsets into it, with a final entry marking the end of the
+        last row.
+        """
+        cell_texts: list[str] = []
+        row_offsets = [0]
+        for row in self.ROW_XPATH(table):
+            for cell in self.CELL_XPATH(row):
+                # Get all text from the cell, joining with spaces if multiple nodes
+                cell_texts.append(' '.join(text.strip() for text in self.TEXT_XPATH(cell)))
+            row_offsets.append(len(cell_texts))
+        return cell_texts, row_offsets
+
+    @staticmethod
+    def first_text(element: Any) -> str:
+        """Return the first text node of an element, like XPath's text() in a string context."""
+        if element.text is not None:
+            return element.text
+        for child in element:
+            if child.tail is not None:
+                return child.tail
+        return ''
+
+    def index_tables(self, root: Any) -> dict[Any, tuple[Optional[str], Optional[str]]]:
+        """Map each frame data table to its section in a single document walk.
+        
+        Returns a dict keyed by table element holding the headline text of the
+        nearest preceding h2 and the headline id of the h2 that precedes the
+        table's enclosing section.
+        """
+        index: dict[Any, tuple[Optional[str], Optional[str]]] = {}
+        last_header: Optional[str] = None
+        last_h2_by_parent: dict[Any, Any] = {}
+        section_ids: list[Optional[str]] = []
+        
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            tag = element.tag
+            if tag == 'h2':
+                if event == 'start':
+                    headline = self.headline(element)
+                    last_header = self.first_text(headline) if headline is not None else None
+                    last_h2_by_parent[element.getparent()] = element
+            elif tag == 'section':
+                if event == 'start':
+                    h2 = last_h2_by_parent.get(element.getparent())
+                    headline = self.headline(h2) if h2 is not None else None
+                    section_ids.append(headline.get('id') if headline is not None else None)
+                else:
+                    section_ids.pop()
+            elif tag == 'table' and event == 'start':
+                classes = element.get('class', '')
+                if any(name in classes for name in self.TABLE_CLASSES):
+                    section_id = next((sid for sid in section_ids if sid is not None), None)
+                    index[element] = (last_header, section_id)
+        
+        return index
+
+    @staticmethod
+    def headline(h2: Any) -> Any:
+        """Return the mw-headline span of an h2, if any."""
+        for span in h2.iter('span'):
+            if span.get('class') == 'mw-headline':
+                return span
+        return None
+
+    def classify_table(
+        self,
+        header: Optional[str],
+        section_id: Optional[str],
+        th_texts: tuple[str, ...],
+        header_texts: tuple[str, ...],
+    ) -> Optional[tuple[str, Optional[str]]]:
+        """Determine a table's type and name from its section and header signature.
+        
+        Returns None for tables that should be skipped. Results are cached by
+        signature, since most pages repeat the same handful of table layouts.
+        """
+        key = (header, section_id, th_texts, header_texts)
+        if key not in self._classification_cache:
+            self._classification_cache[key] = self._classify_table(header, section_id, th_texts, header_texts)
+        return self._classification_cache[key]
+
+    def _classify_table(
+        self,
+        header: Optional[str],
+        section_id: Optional[str],
+        th_texts: tuple[str, ...],
+        header_texts: tuple[str, ...],
+    ) -> Optional[tuple[str, Optional[str]]]:
+        table_type = "unknown"
+        table_name = None
+        has_core_headers = any('Defense' in text or 'Guts' in text for text in th_texts)
+        has_jump_headers = any('Jump Duration' in text for text in th_texts)
+        
+        # Skip glossary and other non-frame data tables
+        section_text = ' '.join(filter(None, [header, section_id])).lower()
+        header_text = ' '.join(header_texts).lower()
+        if any(x in section_text or x in header_text for x in ['glossary', 'what is frame data']):
+            return None
+        
+        # Method 1: Check preceding h2 headers
+        if header:
+            header_lower = header.strip().lower()
+            # Set table name based on header
+            table_name = header.strip().replace(' ', '_').lower()
+            logging.info(f"Found header: {header_lower}")
+            
+            if "system" in header_lower:
+                if "core" in header_lower or has_core_headers:
+                    table_type = "system_core"
+                elif "jump" in header_lower or has_jump_headers:
+                    table_type = "system_jump"
+                else:
+                    table_type = "system_other"
+            elif "normal" in header_lower or "normals" in header_lower:
+                table_type = "normal_moves"
+                logging.info("Found normal moves table by header")
+            elif "special" in header_lower:
+                table_type = "special_moves"
+            elif "overdrive" in header_lower:
+                table_type = "overdrive_moves"
+        
+        # Method 2: Check table content if type is still unknown
+        if table_type == "unknown":
+            logging.info(f"Table headers: {list(header_texts)}")
+            logging.info(f"Found section ID: {section_id}")
+            
+            if section_id == "Special_Moves":
+                table_type = "special_moves"
+                table_name = "special_moves"
+                logging.info("Found special moves table by section")
+            elif section_id == "Normal_Moves":
+                table_type = "normal_moves"
+                table_name = "normal_moves"
+                logging.info("Found normal moves table by section")
+            elif section_id == "Overdrives":
+                table_type = "overdrive_moves"
+                table_name = "overdrive_moves"
+                logging.info("Found overdrive moves table by section")
+            elif section_id == "Other":
+                table_type = "character_specific"
+                table_name = "other"
+                logging.info("Found character-specific table in Other section")
+            # Fallback to content checks if section not found
+            elif has_core_headers:
+                table_type = "system_core"
+                table_name = "system_core"
+            elif has_jump_headers:
+                table_type = "system_jump"
+                table_name = "system_jump"
+            # Check for normal moves table by looking for typical move input headers and content
+            elif any('input' in h.lower() or 'command' in h.lower() or 'move' in h.lower() for h in header_texts) or \
+                 any('damage' in h.lower() and 'startup' in h.lower() for h in header_texts):
+                table_type = "normal_moves"
+                table_name = "normal_moves"
+                logging.info("Found normal moves table by headers")
+            
+            logging.info(f"Table type determined: {table_type}")
+        
+        return table_type, table_name
+
     def parse_frame_data(self, response):
         """Parse frame data tables from character pages."""
         character = response.meta.get('character') if 'character' in response.meta else self.character
+        
+        # Pages whose body is byte-identical to the last crawl emit the tables kept from it,
+        # which includes every page the server confirmed as not modified (304)
+        page_key = character or response.url
+        page_hash = hashlib.sha256(response.body).hexdigest()
+        if self.manifest is not None and self.manifest['pages'].get(page_key) == page_hash:
+            stored = self.stored_tables(page_hash)
+            if stored is not None:
+                logging.info(f"Frame data for {character} unchanged since last crawl, reusing its tables")
+                for table_data in stored:
+                    yield {**table_data, 'unchanged': True}
+                return
+        previous_tables = set(self.manifest['tables'].get(page_key, [])) if self.manifest is not None else set()
+        table_hashes = []
+        page_tables = []
+        
         logging.info(f"Parsing frame data for character: {character}")
         
         # Get all tables that could contain frame data
         tables = response.xpath('//table[contains(@class, "wikitable") or contains(@class, "cargoTable") or contains(@class, "cargoDynamicTable")]')
         logging.info(f"Found {len(tables)} tables")
         
+        # Map every table to its section once, instead of walking backwards per table
+        table_index = self.index_tables(response.selector.root)
+        
         for table in tables:
-            # Try multiple methods to determine the table type
-            table_type = "unknown"
-            table_name = None
+            header, section_id = table_index.get(table.root, (None, None))
             
-            # Method 1: Check preceding h2 headers
-            header = table.xpath('preceding::h2[1]//span[@class="mw-headline"]/text()').get()
-            if header:
-                header_lower = header.strip().lower()
-                # Set table name based on header
-                table_name = header.strip().replace(' ', '_').lower()
-                logging.info(f"Found header: {header_lower}")
-                
-                if "system" in header_lower:
-                    if "core" in header_lower or table.xpath('.//th[contains(text(), "Defense") or contains(text(), "Guts")]'):
-                        table_type = "system_core"
-                    elif "jump" in header_lower or table.xpath('.//th[contains(text(), "Jump Duration")]'):
-                        table_type = "system_jump"
-                    else:
-                        table_type = "system_other"
-                elif "normal" in header_lower or "normals" in header_lower:
-                    table_type = "normal_moves"
-                    logging.info("Found normal moves table by header")
-                elif "special" in header_lower:
-                    table_type = "special_moves"
-                elif "overdrive" in header_lower:
-                    table_type = "overdrive_moves"
-            
-            # Method 2: Check table content if type is still unknown
-            if table_type == "unknown":
-                # Get all header text for debugging
-                header_texts = table.xpath('.//th//text()').getall()
-                logging.info(f"Table headers: {header_texts}")
-                
-                # Check for section headers first
-                section_id = table.xpath('ancestor::section/preceding-sibling::h2[1]//span[@class="mw-headline"]/@id').get()
-                logging.info(f"Found section ID: {section_id}")
-                
-                if section_id == "Special_Moves":
-                    table_type = "special_moves"
-                    table_name = "special_moves"
-                    logging.info("Found special moves table by section")
-                elif section_id == "Normal_Moves":
-                    table_type = "normal_moves"
-                    table_name = "normal_moves"
-                    logging.info("Found normal moves table by section")
-                elif section_id == "Overdrives":
-                    table_type = "overdrive_moves"
-                    table_name = "overdrive_moves"
-                    logging.info("Found overdrive moves table by section")
-                elif section_id == "Other":
-                    table_type = "character_specific"
-                    table_name = "other"
-                    logging.info("Found character-specific table in Other section")
-                # Fallback to content checks if section not found
-                elif table.xpath('.//th[contains(text(), "Defense") or contains(text(), "Guts")]'):
-                    table_type = "system_core"
-                    table_name = "system_core"
-                elif table.xpath('.//th[contains(text(), "Jump Duration")]'):
-                    table_type = "system_jump"
-                    table_name = "system_jump"
-                # Check for normal moves table by looking for typical move input headers and content
-                elif any('input' in h.lower() or 'command' in h.lower() or 'move' in h.lower() for h in header_texts) or \
-                     any('damage' in h.lower() and 'startup' in h.lower() for h in header_texts):
-                    table_type = "normal_moves"
-                    table_name = "normal_moves"
-                    logging.info("Found normal moves table by headers")
+            # Classify by header signature; identical tables only get classified once
+            th_texts = tuple(self.first_text(th) for th in table.root.iter('th'))
+            header_texts = tuple(text for th in table.root.iter('th') for text in th.itertext())
+            classification = self.classify_table(header, section_id, th_texts, header_texts)
+            if classification is None:
                 # Skip glossary and other non-frame data tables
-                elif any(x in table.xpath('string(.)').get().lower() for x in ['glossary', 'what is frame data']):
-                    continue
-                
-                logging.info(f"Table type determined: {table_type}")
+                continue
+            table_type, table_name = classification
             
-            # Get table headers
+            # Get table headers along with the column each one labels
             headers = []
-            header_row = table.xpath('.//tr[1]')
-            if header_row:
+            columns = []
+            for header_row in self.HEADER_ROW_XPATH(table.root):
                 # Get all header cells, not just text nodes
-                header_cells = header_row.xpath('.//th')
-                headers = []
-                for cell in header_cells:
+                for column, cell in enumerate(self.HEADER_CELL_XPATH(header_row)):
                     # Get all text from the cell, joining with spaces if multiple nodes
-                    header_text = ' '.join(text.strip() for text in cell.xpath('.//text()').getall())
+                    header_text = ' '.join(text.strip() for text in self.TEXT_XPATH(cell))
                     if header_text.strip():
                         cleaned_header = self.clean_header(header_text.strip())
                         if cleaned_header not in headers:  # Prevent duplicate headers
                             headers.append(cleaned_header)
+                            columns.append(column)
                             logging.info(f"Header '{header_text}' cleaned to '{cleaned_header}'")
-                logging.info(f"Found {len(headers)} headers: {headers}")
+            logging.info(f"Found {len(headers)} headers: {headers}")
             
             if not headers:
                 logging.warning(f"No headers found in table, skipping")
                 continue
             
-            # Process data rows
+            # Process data rows from a flat buffer of every cell's text in the table
+            cell_texts, row_offsets = self.extract_cells(table.root)
             rows = []
-            for row_idx, row in enumerate(table.xpath('.//tr[td]')):
-                cells = row.xpath('.//td')
+            for row_idx in range(len(row_offsets) - 1):
+                start = row_offsets[row_idx]
+                cell_count = row_offsets[row_idx + 1] - start
                 row_data = {}
                 
                 # Log the raw cells for debugging
-                raw_cells = [' '.join(cell.xpath('.//text()').getall()).strip() for cell in cells]
-                logging.info(f"Row {row_idx} raw cells ({len(raw_cells)}): {raw_cells}")
+                logging.info(f"Row {row_idx} raw cells ({cell_count}): {cell_texts[start:start + cell_count]}")
                 
                 # Extract cell data - iterate over headers to ensure alignment
-                for i, header in enumerate(headers):
-                    if i >= len(cells):
-                        logging.warning(f"Row {row_idx}: Missing cell for header '{header}' at index {i}")
+                for header, column in zip(headers, columns):
+                    if column >= cell_count:
+                        logging.warning(f"Row {row_idx}: Missing cell for header '{header}' at index {column}")
                         row_data[header] = None
                         continue
-                        
-                    cell = cells[i]
-                    # Get all text from the cell, joining with spaces if multiple nodes
-                    cell_text = ' '.join(text.strip() for text in cell.xpath('.//text()').getall())
-                    row_data[header] = self.clean_cell_value(cell_text)
-                    logging.info(f"Row {row_idx}: Mapped header '{header}' to value '{cell_text.strip()}'")
+                    
+                    row_data[header] = self.clean_cell_value(cell_texts[start + column])
                 
                 # Only include if we have meaningful data
                 if row_data and any(v is not None for v in row_data.values()):
@@ -351,14 +549,28 @@ class DustloopSpider(scrapy.Spider):
                 if not table_name:
                     table_name = f"{table_type}_{len(rows)}"
                 
+                # Flag tables identical to the last crawl so later stages can skip them
+                table_hash = hashlib.sha256(
+                    json.dumps([table_type, table_name, headers, rows], sort_keys=True).encode('utf-8')
+                ).hexdigest()
+                table_hashes.append(table_hash)
+                
                 # Create the table data structure
                 table_data = {
                     'character': character,
                     'table_name': f"{character}.{table_name}",
                     'table_type': table_type,
                     'headers': headers,
-                    'rows': rows
+                    'rows': rows,
+                    'unchanged': table_hash in previous_tables,
                 }
                 
                 logging.info(f"Yielding {table_type} table with {len(rows)} rows")
-                yield table_data 
\ No newline at end of file
+                page_tables.append(table_data)
+                yield table_data
+        
+        # Remember what this page looked like for the next crawl
+        if self.manifest is not None:
+            self.store_tables(page_key, page_hash, page_tables)
+            self.manifest['pages'][page_key] = page_hash
+            self.manifest['tables'][page_key] = table_hashes 
\ No newline at end of file
@@ -0,0 +1,178 @@
+from typing import Any, Callable, Dict, List
+
+JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'null': type(None),
+}
+
+Validator = Callable[..., List[str]]
+
+# Stands in for a field the value doesn't have, since None is a JSON value
+MISSING = object()
+
+def schema_errors(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Check a value against the subset of JSON Schema used by the frame data schemas."""
+    types = schema.get('type')
+    if types:
+        types = [types] if isinstance(types, str) else types
+        # bool is an int in Python but not a JSON number
+        if isinstance(value, bool) and 'boolean' not in types or not isinstance(value, tuple(JSON_TYPES[t] for t in types)):
+            return [f"{path} should be {' or '.join(types)}, got {type(value).__name__}"]
+
+    errors = []
+    if isinstance(value, dict):
+        for field in schema.get('required', []):
+            if field not in value:
+                errors.append(f"{path} is missing required field '{field}'")
+        properties = schema.get('properties', {})
+        for field, field_value in value.items():
+            if field in properties:
+                errors.extend(schema_errors(field_value, properties[field], f"{path}.{field}"))
+            elif schema.get('additionalProperties') is False:
+                errors.append(f"{path} has unexpected field '{field}'")
+    elif isinstance(value, list) and 'items' in schema:
+        for i, item in enumerate(value):
+            errors.extend(schema_errors(item, schema['items'], f"{path}[{i}]"))
+    return errors
+
+def literal(text: str) -> str:
+    """Escape text for use inside a generated double-quoted f-string."""
+    return text.replace('\\', '\\\\').replace('"', '\\"').replace('{', '{{').replace('}', '}}')
+
+def type_set(types: List[str]) -> frozenset:
+    """The exact Python types a JSON value of the given types loads as."""
+    classes = set()
+    for t in types:
+        classes.update(JSON_TYPES[t] if isinstance(JSON_TYPES[t], tuple) else [JSON_TYPES[t]])
+    return frozenset(classes)
+
+def schema_types(schema: Dict[str, Any]) -> List[str]:
+    types = schema.get('type') or []
+    return [types] if isinstance(types, str) else list(types)
+
+def is_leaf(schema: Dict[str, Any]) -> bool:
+    """Whether a schema only checks the type of its value."""
+    return not any(key in schema for key in ('properties', 'required', 'items'))
+
+class ValidatorCompiler:
+    """Generate the source of a validator function for one schema.
+
+    Checks are unrolled into straight-line code, with one lookup per
+    declared property and type checks done as a set lookup on the value's
+    exact type. An object's fields are only walked to find unexpected ones
+    when additionalProperties is false. Paths in error messages are only
+    formatted when an error is found.
+    """
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+        self.names = 0
+
+    def constant(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def variable(self, prefix: str) -> str:
+        self.names += 1
+        return f"{prefix}{self.names}"
+
+    def emit(self, indent: int, line: str) -> None:
+        self.lines.append('    ' * indent + line)
+
+    def check(self, schema: Dict[str, Any], value: str, path: str, indent: int) -> None:
+        """Emit the checks of schema against the variable named value; path is an f-string fragment."""
+        types = schema_types(schema)
+        if types:
+            self.emit(indent, f"if type({value}) not in {self.constant(type_set(types))}:")
+            self.emit(indent + 1, f'errors.append(f"{path} should be {literal(" or ".join(types))}, got {{type({value}).__name__}}")')
+            if is_leaf(schema):
+                return
+            self.emit(indent, "else:")
+            indent += 1
+        elif is_leaf(schema):
+            return
+
+        if 'object' in types or not types and ('properties' in schema or 'required' in schema):
+            if not types or len(types) > 1:
+                self.emit(indent, f"if type({value}) is dict:")
+                self.check_object(schema, value, path, indent + 1)
+                if 'items' in schema:
+                    self.emit(indent, f"elif type({value}) is list:")
+                    self.check_items(schema, value, path, indent + 1)
+            else:
+                self.check_object(schema, value, path, indent)
+        elif 'items' in schema:
+            if not types or len(types) > 1:
+                self.emit(indent, f"if type({value}) is list:")
+                indent += 1
+            self.check_items(schema, value, path, indent)
+        else:
+            self.emit(indent, "pass")
+
+    def check_object(self, schema: Dict[str, Any], value: str, path: str, indent: int) -> None:
+        for field in schema.get('required', []):
+            self.emit(indent, f"if {field!r} not in {value}:")
+            self.emit(indent + 1, f'errors.append(f"{path} is missing required field \'{literal(field)}\'")')
+        emitted = bool(schema.get('required'))
+
+        # One lookup per declared property, instead of walking the value's fields
+        properties = schema.get('properties', {})
+        for name, property_schema in properties.items():
+            if is_leaf(property_schema) and not schema_types(property_schema):
+                continue
+            item = self.variable('v')
+            self.emit(indent, f"{item} = {value}.get({name!r}, _MISSING)")
+            if is_leaf(property_schema):
+                types = schema_types(property_schema)
+                self.emit(indent, f"if {item} is not _MISSING and type({item}) not in {self.constant(type_set(types))}:")
+                self.emit(indent + 1, f'errors.append(f"{path}.{literal(name)} should be {literal(" or ".join(types))}, got {{type({item}).__name__}}")')
+            else:
+                self.emit(indent, f"if {item} is not _MISSING:")
+                self.check(property_schema, item, f"{path}.{literal(name)}", indent + 1)
+            emitted = True
+
+        if schema.get('additionalProperties') is False:
+            field = self.variable('f')
+            self.emit(indent, f"for {field} in {value}:")
+            self.emit(indent + 1, f"if {field} not in {self.constant(frozenset(properties))}:")
+            self.emit(indent + 2, f'errors.append(f"{path} has unexpected field \'{{{field}}}\'")')
+            emitted = True
+        if not emitted:
+            self.emit(indent, "pass")
+
+    def check_items(self, schema: Dict[str, Any], value: str, path: str, indent: int) -> None:
+        if is_leaf(schema['items']) and not schema_types(schema['items']):
+            self.emit(indent, "pass")
+            return
+        index, item = self.variable('i'), self.variable('item')
+        self.emit(indent, f"for {index}, {item} in enumerate({value}):")
+        self.check(schema['items'], item, f"{path}[{{{index}}}]", indent + 1)
+
+    def compile(self, schema: Dict[str, Any], name: str) -> Validator:
+        self.emit(0, f'def {name}(value, path="$"):')
+        self.emit(1, "errors = []")
+        self.check(schema, "value", "{path}", 1)
+        self.emit(1, "return errors")
+        source = "\n".join(self.lines) + "\n"
+
+        namespace = {'_MISSING': MISSING, **self.constants}
+        exec(compile(source, f"<validator {name}>", "exec"), namespace)
+        validator = namespace[name]
+        validator.source = source
+        return validator
+
+def compile_validator(schema: Dict[str, Any], name: str = "validate") -> Validator:
+    """Compile a schema into a function returning the same errors as schema_errors.
+
+    Values are expected as loaded from JSON, so types are matched exactly
+    rather than with isinstance. An object's errors follow the order of the
+    schema's properties rather than of the value's fields.
+    """
+    return ValidatorCompiler().compile(schema, name)
@@ -0,0 +1,244 @@
+import json
+from datetime import timedelta
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, text
+from sqlmodel import Session, create_engine, select
+from scraper.db import BulkLoader, advisory_lock_key, copy_value, import_api_json_to_db, import_json_to_db, init_db
+from scraper.commands.parse import NORMAL_MOVE_SCHEMA
+from scraper.models import Character, CharacterSpecificTable, NormalMoves, SpecialMoves
+from scraper.normalize import normalize_table
+
+def get_database(tmp_path):
+    """Helper to create an empty SQLite database"""
+    database_url = f"sqlite:///{tmp_path / 'frame_data.db'}"
+    init_db(database_url)
+    return database_url
+
+def character(name, **tables):
+    """Helper to build one character of parsed frame data"""
+    data = {'name': name, 'normal_moves': [], 'special_moves': [], 'overdrive_moves': [], 'system_core': [], 'system_jump': []}
+    data.update(tables)
+    return data
+
+def test_import_json_writes_rows_in_bulk(tmp_path):
+    """Test that parsed frame data is written without going through the ORM"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'parsed.json'
+    json_path.write_text(json.dumps({'characters': [
+        character('Sol Badguy',
+                  normal_moves=[{'input': '5P', 'damage': 20, 'guard': 'All', 'on_block': -1}],
+                  special_moves=[{'name': 'Gun Flame', 'input': '236P', 'invuln': None}]),
+        character('Ky Kiske', system_jump=[{'jump_duration': 45, 'air_movement_options': ['Double Jump']}]),
+    ]}))
+
+    stats = import_json_to_db(json_path, database_url)
+    assert stats.rows == {'characters': 2, 'normal_moves': 1, 'special_moves': 1, 'system_jump_data': 1}
+    assert stats.total == 5
+
+    with Session(create_engine(database_url)) as session:
+        assert [c.slug for c in session.exec(select(Character))] == ['sol_badguy', 'ky_kiske']
+        normal = session.exec(select(NormalMoves)).one()
+        assert (normal.character, normal.table_name, normal.table_type) == ('Sol Badguy', 'Sol Badguy Normal Moves', 'normal_moves')
+        assert (normal.damage, normal.guard, normal.on_block, normal.startup) == ('20', 'All', '-1', '')
+        assert normal.created_at is not None and normal.id == 1
+        special = session.exec(select(SpecialMoves)).one()
+        assert (special.name, special.input, special.invuln) == ('Gun Flame', '236P', None)
+        jump = session.exec(text("SELECT jump_duration, air_movement_options FROM system_jump_data")).one()
+        assert tuple(jump) == ('45', '["Double Jump"]')
+
+def test_import_api_json_groups_moves(tmp_path):
+    """Test that cargoquery moves are routed to their tables with fallback names"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'move_data.json'
+    moves = [
+        {'chara': 'Sol Badguy', 'type': 'normal', 'input': '5P', 'damage': '20', 'onBlock': '-1', 'prorate': '80%'},
+        {'chara': 'Sol Badguy', 'type': 'special', 'name': None, 'input': '236P'},
+        {'chara': 'Sol Badguy', 'type': 'other', 'name': 'Dash Cancel', 'input': '66'},
+        {'chara': 'Ky Kiske', 'type': 'super', 'name': 'Ride the Lightning', 'input': '632146H', 'inputTension': '50%'},
+    ]
+    json_path.write_text(json.dumps({'cargoquery': [{'title': move} for move in moves]}))
+
+    stats = import_api_json_to_db(json_path, database_url)
+    assert stats.rows == {'characters': 2, 'normal_moves': 1, 'special_moves': 1, 'character_specific_tables': 1,
+                          'overdrive_moves': 1}
+
+    with Session(create_engine(database_url)) as session:
+        normal = session.exec(select(NormalMoves)).one()
+        assert (normal.table_type, normal.on_block, normal.proration) == ('normal', '-1', '80%')
+        assert session.exec(select(SpecialMoves)).one().name == 'Special Move 236P'
+        specific = session.exec(select(CharacterSpecificTable)).one()
+        assert specific.table_name == 'Sol Badguy Dash Cancel'
+        assert specific.rows == [moves[2]]
+        overdrive = session.exec(text("SELECT table_type, tension_gain FROM overdrive_moves")).one()
+        assert tuple(overdrive) == ('overdrive', '50%')
+
+def test_bulk_loader_writes_in_batches(tmp_path):
+    """Test that rows are flushed once a batch fills up and the rest on finish"""
+    engine = create_engine(get_database(tmp_path))
+    with engine.begin() as connection:
+        loader = BulkLoader(connection, batch_size=2)
+        for i in range(3):
+            loader.add(NormalMoves, {'character': 'Sol', 'table_name': 'Sol Normal Moves', 'table_type': 'normal_moves', 'input': f'{i}P'})
+        assert connection.execute(text("SELECT count(*) FROM normal_moves")).scalar() == 2
+        stats = loader.finish()
+        assert connection.execute(text("SELECT count(*) FROM normal_moves")).scalar() == 3
+    assert stats.rows == {'normal_moves': 3}
+
+def test_copy_value_escapes_text_format():
+    """Test that values are escaped for COPY's text format"""
+    assert copy_value(None) == '\\N'
+    assert copy_value('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
+    assert copy_value(['Double Jump']) == '["Double Jump"]'
+    assert copy_value(20) == '20'
+
+def test_incremental_import_only_writes_changes(tmp_path):
+    """Test that an incremental import upserts changed rows and deletes removed ones"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'parsed.json'
+    moves = [{'input': '5P', 'damage': 20}, {'input': '5K', 'damage': 25}, {'input': '6P', 'damage': 32}]
+    json_path.write_text(json.dumps({'characters': [character('Sol Badguy', normal_moves=moves)]}))
+    import_json_to_db(json_path, database_url, mode='full')
+
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        # A row imported before row keys existed
+        connection.execute(text("INSERT INTO normal_moves (character, table_name, table_type, input, created_at, updated_at) "
+                                "VALUES ('Sol Badguy', 'Sol Badguy Normal Moves', 'normal_moves', '5P', '2025-01-01', '2025-01-01')"))
+    with Session(engine) as session:
+        ids = {move.input: move.id for move in session.exec(select(NormalMoves)) if move.row_key}
+
+    moves = [{'input': '5P', 'damage': 20}, {'input': '5K', 'damage': 26}, {'input': '2D', 'damage': 28}]
+    json_path.write_text(json.dumps({'characters': [character('Sol Badguy', normal_moves=moves)]}))
+    stats = import_json_to_db(json_path, database_url, mode='incremental')
+    assert stats.rows == {'normal_moves': 2}, "Only the changed and new moves should be written"
+    assert (stats.unchanged, stats.deleted) == (1, 2)
+
+    with Session(engine) as session:
+        rows = {move.input: move for move in session.exec(select(NormalMoves))}
+        assert sorted(rows) == ['2D', '5K', '5P']
+        assert rows['5K'].damage == '26'
+        assert rows['5P'].id == ids['5P'] and rows['5K'].id == ids['5K'], "Existing rows should be updated in place"
+        assert rows['5P'].row_key == 'normal_moves|Sol Badguy Normal Moves|5P'
+        assert len(session.exec(select(Character)).all()) == 1
+
+    stats = import_json_to_db(json_path, database_url, mode='incremental')
+    assert (stats.total, stats.unchanged, stats.deleted) == (0, 3, 0)
+
+def test_repeated_rows_get_distinct_keys(tmp_path):
+    """Test that rows with the same natural key are told apart by their order"""
+    engine = create_engine(get_database(tmp_path))
+    with engine.begin() as connection:
+        loader = BulkLoader(connection)
+        for _ in range(2):
+            loader.add(NormalMoves, {'character': 'Sol', 'table_name': 'Sol Normal Moves', 'table_type': 'normal_moves', 'input': '5P'})
+        loader.finish()
+        keys = connection.execute(text("SELECT row_key FROM normal_moves ORDER BY id")).scalars().all()
+    assert keys == ['normal_moves|Sol Normal Moves|5P', 'normal_moves|Sol Normal Moves|5P#2']
+
+def test_bulk_loader_writes_to_target_tables(tmp_path):
+    """Test that rows can be redirected to a staging copy of a table"""
+    engine = create_engine(get_database(tmp_path))
+    with engine.begin() as connection:
+        connection.execute(text(f"ATTACH DATABASE '{tmp_path / 'staging.db'}' AS staging"))
+        staging = NormalMoves.__table__.to_metadata(MetaData(), schema='staging')
+        staging.create(connection)
+        loader = BulkLoader(connection, targets={NormalMoves.__table__: staging})
+        loader.add(NormalMoves, {'character': 'Sol', 'table_name': 'Sol Normal Moves', 'table_type': 'normal_moves', 'input': '5P'})
+        assert loader.finish().rows == {'normal_moves': 1}
+        assert connection.execute(text("SELECT input FROM staging.normal_moves")).scalars().all() == ['5P']
+        assert connection.execute(text("SELECT count(*) FROM main.normal_moves")).scalar() == 0
+
+def test_swap_import_needs_postgresql(tmp_path):
+    """Test that swapping tables is refused on databases without schemas to swap between"""
+    json_path = tmp_path / 'parsed.json'
+    json_path.write_text(json.dumps({'characters': [character('Sol Badguy')]}))
+    with pytest.raises(ValueError, match="Swap imports need PostgreSQL"):
+        import_json_to_db(json_path, get_database(tmp_path), mode='swap')
+
+def test_character_import_replaces_only_named_characters(tmp_path):
+    """Test that a character import replaces one character's rows and leaves the rest alone"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'parsed.json'
+    roster = [
+        character('Sol Badguy', normal_moves=[{'input': '5P', 'damage': 20}, {'input': '5K', 'damage': 25}]),
+        character('Ky Kiske', normal_moves=[{'input': '5P', 'damage': 22}]),
+    ]
+    json_path.write_text(json.dumps({'characters': roster}))
+    assert import_json_to_db(json_path, database_url, mode='character', jobs=2).rows == {'characters': 2, 'normal_moves': 3}
+
+    engine = create_engine(database_url)
+    with Session(engine) as session:
+        ky_id = session.exec(select(NormalMoves).where(NormalMoves.character == 'Ky Kiske')).one().id
+
+    roster[0]['normal_moves'] = [{'input': '5P', 'damage': 21}]
+    roster[1]['normal_moves'] = [{'input': '5P', 'damage': 99}]
+    json_path.write_text(json.dumps({'characters': roster}))
+    stats = import_json_to_db(json_path, database_url, mode='character', only=['sol badguy'])
+    assert (stats.rows, stats.deleted) == ({'normal_moves': 1}, 2)
+
+    with Session(engine) as session:
+        moves = {(move.character, move.input): move for move in session.exec(select(NormalMoves))}
+        assert sorted(moves) == [('Ky Kiske', '5P'), ('Sol Badguy', '5P')]
+        assert moves[('Sol Badguy', '5P')].damage == '21'
+        assert moves[('Ky Kiske', '5P')].damage == '22' and moves[('Ky Kiske', '5P')].id == ky_id
+        assert len(session.exec(select(Character)).all()) == 2
+
+    with pytest.raises(ValueError, match="character import mode"):
+        import_json_to_db(json_path, database_url, mode='incremental', only=['Sol Badguy'])
+
+def test_advisory_lock_keys_are_stable_bigints():
+    """Test that lock keys fit a PostgreSQL bigint and differ between characters"""
+    key = advisory_lock_key('Sol Badguy')
+    assert key == advisory_lock_key('Sol Badguy')
+    assert key != advisory_lock_key('Ky Kiske')
+    assert -2 ** 63 <= key < 2 ** 63
+
+@pytest.mark.parametrize('mode', ['full', 'incremental', 'character'])
+def test_api_import_keeps_split_runs_of_a_character(tmp_path, mode):
+    """Test that a character whose cargoquery entries aren't contiguous keeps all of their moves"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'move_data.json'
+    moves = [
+        {'chara': 'Sol Badguy', 'type': 'normal', 'input': '5P'},
+        {'chara': 'Ky Kiske', 'type': 'normal', 'input': '5P'},
+        {'chara': 'Sol Badguy', 'type': 'normal', 'input': '5K'},
+        {'chara': 'Sol Badguy', 'type': 'normal', 'input': '5P'},
+    ]
+    json_path.write_text(json.dumps({'cargoquery': [{'title': move} for move in moves]}))
+
+    # A full import expects empty tables, the others also have to replace what's there
+    for _ in range(1 if mode == 'full' else 2):
+        stats = import_api_json_to_db(json_path, database_url, mode=mode, jobs=2)
+        assert not stats.failed
+    with Session(create_engine(database_url)) as session:
+        assert sorted((move.character, move.input) for move in session.exec(select(NormalMoves))) == [
+            ('Ky Kiske', '5P'), ('Sol Badguy', '5K'), ('Sol Badguy', '5P'), ('Sol Badguy', '5P')]
+        assert len(session.exec(select(Character)).all()) == 2
+
+def test_import_keeps_normalized_blank_cells_empty(tmp_path):
+    """Test that blank cells normalized to None are stored as empty text, not 'None'"""
+    database_url = get_database(tmp_path)
+    json_path = tmp_path / 'parsed.json'
+    normalized, _ = normalize_table([{'input': '5P', 'damage': '', 'on_block': '-1', 'guard': ' '}], NORMAL_MOVE_SCHEMA)
+    json_path.write_text(json.dumps({'characters': [character('Sol Badguy', normal_moves=normalized)]}))
+    import_json_to_db(json_path, database_url)
+
+    with Session(create_engine(database_url)) as session:
+        move = session.exec(select(NormalMoves)).one()
+        assert (move.damage, move.on_block, move.guard) == ('', '-1', None)
+
+def test_bulk_loader_writes_naive_utc_timestamps(tmp_path):
+    """Test that timestamps are naive UTC like the models' defaults, unless the column stores a time zone"""
+    metadata = MetaData()
+    naive = Table('naive_rows', metadata, Column('id', Integer, primary_key=True), Column('created_at', DateTime()))
+    aware = Table('aware_rows', metadata, Column('id', Integer, primary_key=True), Column('created_at', DateTime(timezone=True)))
+    engine = create_engine(f"sqlite:///{tmp_path / 'timestamps.db'}")
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        loader = BulkLoader(connection)
+        loader.write(naive, {})
+        loader.write(aware, {})
+        assert loader.pending[naive][0][0].tzinfo is None
+        assert loader.pending[aware][0][0].utcoffset() == timedelta(0)
+        assert loader.pending[aware][0][0].replace(tzinfo=None) == loader.pending[naive][0][0]
+        loader.finish()
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+import pytest
+import requests
+from scraper.commands.download import RateLimiter, download_frame_data, fetch
+
+PAGE = b'<html><body>Sol Badguy frame data</body></html>'
+
+class FrameDataHandler(BaseHTTPRequestHandler):
+    """Serve one frame data page with an ETag, answering 304 when it matches"""
+    requests_seen: list = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.path != '/w/GGST/Sol_Badguy/Frame_Data':
+            self.send_error(404)
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    FrameDataHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FrameDataHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+
+def download(server, output_dir, **kwargs):
+    """Helper to download Sol's page from the test server"""
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/w/GGST'
+    download_frame_data(output_dir=str(output_dir), character='Sol_Badguy', rate=0, base_url=base_url, **kwargs)
+
+def test_records_manifest_and_revalidates(server, tmp_path):
+    """Test that downloads are recorded and later sent as conditional requests"""
+    download(server, tmp_path)
+    assert (tmp_path / 'sol_badguy_frame_data.html').read_bytes() == PAGE
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    assert manifest['Sol_Badguy']['status'] == 'ok'
+    assert manifest['Sol_Badguy']['etag'] == '"v1"'
+    assert manifest['Sol_Badguy']['size'] == len(PAGE)
+
+    download(server, tmp_path)
+    assert FrameDataHandler.requests_seen[-1] == ('/w/GGST/Sol_Badguy/Frame_Data', '"v1"')
+    assert (tmp_path / 'sol_badguy_frame_data.html').read_bytes() == PAGE, "304 should keep the saved file"
+
+def test_resume_skips_complete_and_refetches_missing(server, tmp_path):
+    """Test that resume only fetches characters that are missing on disk"""
+    download(server, tmp_path)
+    download(server, tmp_path, resume=True)
+    assert len(FrameDataHandler.requests_seen) == 1, "Complete downloads should not be requested again"
+
+    (tmp_path / 'sol_badguy_frame_data.html').unlink()
+    download(server, tmp_path, resume=True)
+    assert FrameDataHandler.requests_seen[-1] == ('/w/GGST/Sol_Badguy/Frame_Data', None)
+    assert (tmp_path / 'sol_badguy_frame_data.html').exists()
+
+def test_records_failures(server, tmp_path):
+    """Test that failed characters are marked so a resumed run retries them"""
+    base_url = f'http://127.0.0.1:{server.server_address[1]}/w/GGST'
+    download_frame_data(output_dir=str(tmp_path), character='Nobody', rate=0, retries=0, base_url=base_url)
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    assert manifest['Nobody']['status'] == 'failed'
+
+def test_gives_up_on_long_retry_after():
+    """Test that a Retry-After past the cap returns the response instead of sleeping"""
+    response = requests.Response()
+    response.status_code = 503
+    response.headers['Retry-After'] = '86400'
+    session = MagicMock()
+    session.get.return_value = response
+
+    start = time.monotonic()
+    assert fetch(session, RateLimiter(0), 'http://example.com', max_retry_after=60) is response
+    assert time.monotonic() - start < 1
+    assert session.get.call_count == 1
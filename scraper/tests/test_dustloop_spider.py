@@ -123,4 +123,28 @@ def test_data_alignment():
                 # Check that RISC values are in correct columns
                 if any(v.endswith('%') for v in [row['risc_gain'], row['risc_loss']]):
                     assert not any(v.endswith('%') for v in [row['input'], row['damage'], row['guard']]), \
-                        f"Found percentage in wrong column: {row}" 
\ No newline at end of file
+                        f"Found percentage in wrong column: {row}" 
+
+def test_manifest_reuses_unchanged_pages(tmp_path):
+    """Test that unchanged pages emit their stored tables and unchanged tables are flagged"""
+    spider = DustloopSpider()
+    spider.load_manifest(tmp_path / 'manifest.json')
+    response = get_test_response('frame_data.html')
+
+    first = list(spider.parse_frame_data(response))
+    assert first and not any(item['unchanged'] for item in first), "New tables should not be flagged"
+    spider.closed('finished')
+
+    # Reload the manifest as a new crawl would
+    spider = DustloopSpider()
+    spider.load_manifest(tmp_path / 'manifest.json')
+    second = list(spider.parse_frame_data(response))
+    assert [{**item, 'unchanged': False} for item in second] == first, "Identical pages should emit their stored tables"
+    assert all(item['unchanged'] for item in second), "Stored tables should be flagged unchanged"
+
+    # Same tables in a page that changed elsewhere
+    changed = response.replace(body=response.body + b'<!-- edited -->')
+    second = list(spider.parse_frame_data(changed))
+    assert len(second) == len(first)
+    assert all(item['unchanged'] for item in second), "Identical tables should be flagged"
+    assert len(list((tmp_path / 'manifest_tables').iterdir())) == 1, "Tables of the old page should be dropped"
@@ -0,0 +1,108 @@
+import os
+from email.utils import formatdate
+from time import time
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.settings import Settings
+from scrapy.utils.test import get_crawler
+from scraper.httpcache import RevalidatingCacheMiddleware, RevalidatingCachePolicy, SQLiteCacheStorage
+from scraper.spiders.dustloop_spider import DustloopSpider
+
+URL = 'https://www.dustloop.com/w/GGST/Sol_Badguy/Frame_Data'
+
+def get_cached_response(**headers):
+    """Helper to build a cached page with the given headers"""
+    headers.setdefault('Date', formatdate(usegmt=True))
+    return HtmlResponse(url=URL, body=b'<html></html>', headers=headers, request=Request(URL))
+
+def test_sends_conditional_request():
+    """Test that stored validators are sent back to the server"""
+    policy = RevalidatingCachePolicy(Settings())
+    request = Request(URL)
+    cached = get_cached_response(ETag='"abc"', **{'Last-Modified': 'Wed, 26 Mar 2025 00:00:00 GMT'})
+
+    assert not policy.is_cached_response_fresh(cached, request), "Cached pages should be revalidated"
+    assert request.headers[b'If-None-Match'] == b'"abc"'
+    assert request.headers[b'If-Modified-Since'] == b'Wed, 26 Mar 2025 00:00:00 GMT'
+
+def test_revalidate_after():
+    """Test that recently fetched pages are trusted without asking"""
+    policy = RevalidatingCachePolicy(Settings({'HTTPCACHE_REVALIDATE_AFTER': 3600}))
+    request = Request(URL)
+
+    assert policy.is_cached_response_fresh(get_cached_response(ETag='"abc"'), request)
+    assert b'If-None-Match' not in request.headers
+
+def get_frame_data():
+    """Helper to read the sample frame data page"""
+    return open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frame_data.html'), 'rb').read()
+
+def test_not_modified_restarts_revalidate_after():
+    """Test that a 304 flags the cached page and restarts its age from the revalidation"""
+    policy = RevalidatingCachePolicy(Settings({'HTTPCACHE_REVALIDATE_AFTER': 3600}))
+    cached = get_cached_response(ETag='"abc"', Date=formatdate(time() - 7200, usegmt=True))
+    assert not policy.is_cached_response_fresh(cached, Request(URL)), "Old pages should be revalidated"
+
+    not_modified = Response(URL, status=304, headers={'Date': formatdate(usegmt=True), 'ETag': '"abc"'})
+    assert policy.is_cached_response_valid(cached, not_modified, Request(URL))
+    assert 'revalidated' in cached.flags
+    assert policy.is_cached_response_fresh(cached, Request(URL)), "A revalidated page should be fresh again"
+
+def test_not_modified_pages_still_emit_tables():
+    """Test that a page confirmed by a 304 still has its tables emitted"""
+    cached = HtmlResponse(url=URL, body=get_frame_data(), request=Request(URL, meta={'character': 'Sol_Badguy'}))
+    cached.flags.append('revalidated')
+    assert list(DustloopSpider().parse_frame_data(cached)), "Unchanged pages should not drop their tables"
+
+def test_not_modified_page_is_stored_again(tmp_path, monkeypatch):
+    """Test that the refreshed Date of a revalidated page is kept in the cache"""
+    monkeypatch.setattr(RevalidatingCacheMiddleware, 'stores_revalidated', False)
+    crawler = get_crawler(DustloopSpider, {
+        'HTTPCACHE_ENABLED': True,
+        'HTTPCACHE_DIR': str(tmp_path),
+        'HTTPCACHE_STORAGE': 'scraper.httpcache.SQLiteCacheStorage',
+        'HTTPCACHE_POLICY': 'scraper.httpcache.RevalidatingCachePolicy',
+    })
+    spider = DustloopSpider.from_crawler(crawler)
+    crawler.spider = spider
+    middleware = RevalidatingCacheMiddleware.from_crawler(crawler)
+    middleware.spider_opened(spider)
+
+    old_date = formatdate(time() - 7200, usegmt=True)
+    middleware.storage.store_response(spider, Request(URL), get_cached_response(ETag='"abc"', Date=old_date))
+    request = Request(URL)
+    assert middleware.process_request(request) is None, "The cached page should be revalidated"
+    new_date = formatdate(usegmt=True)
+    served = middleware.process_response(request, Response(URL, status=304, headers={'Date': new_date}))
+
+    assert 'revalidated' in served.flags
+    assert middleware.storage.retrieve_response(spider, Request(URL)).headers[b'Date'] == new_date.encode()
+    middleware.storage.close_spider(spider)
+
+def test_modified_page_replaces_cache():
+    """Test that a changed page is not served from the cache"""
+    policy = RevalidatingCachePolicy(Settings())
+    cached = get_cached_response(ETag='"abc"')
+    response = get_cached_response(ETag='"def"')
+
+    assert not policy.is_cached_response_valid(cached, response, Request(URL))
+    assert policy.should_cache_response(response, Request(URL))
+
+def test_sqlite_storage_round_trip(tmp_path):
+    """Test that responses survive a store and retrieve through SQLite"""
+    crawler = get_crawler(DustloopSpider, {'HTTPCACHE_DIR': str(tmp_path)})
+    spider = DustloopSpider.from_crawler(crawler)
+    storage = SQLiteCacheStorage(crawler.settings)
+    storage.open_spider(spider)
+
+    request = Request(URL)
+    body = get_frame_data()
+    storage.store_response(spider, request, HtmlResponse(url=URL, body=body, headers={'ETag': '"abc"'}))
+    assert storage.retrieve_response(spider, Request(URL + '?other')) is None, "Unknown requests should miss"
+
+    cached = storage.retrieve_response(spider, request)
+    storage.close_spider(spider)
+
+    assert isinstance(cached, HtmlResponse)
+    assert cached.body == body
+    assert cached.headers[b'ETag'] == b'"abc"'
+    assert list(tmp_path.iterdir()) == [tmp_path / 'dustloop.sqlite3'], "Cache should be a single file"
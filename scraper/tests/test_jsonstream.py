@@ -0,0 +1,42 @@
+import io
+import json
+import pytest
+from scraper.jsonstream import iter_json_array
+
+DOCUMENT = {
+    'meta': {'note': 'a "quoted" ] } value', 'sizes': [1, 2, 3]},
+    'characters': [
+        {'name': 'Sol Badguy', 'moves': [{'input': '5P', 'damage': 20}, {'input': '6H', 'damage': 123456789}]},
+        {'name': 'Ky Kiske → \\[ ]', 'moves': []},
+        12345,
+        -1.5e3,
+        True,
+        None,
+    ],
+    'after': [{'ignored': True}],
+}
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+def test_iter_json_array_matches_json_load(chunk_size):
+    """Test that streamed items match a full load however the file is split into chunks"""
+    for indent in (None, 2):
+        text = json.dumps(DOCUMENT, indent=indent)
+        assert list(iter_json_array(io.StringIO(text), 'characters', chunk_size)) == DOCUMENT['characters']
+    assert list(iter_json_array(io.StringIO('{"characters": [ ]}'), 'characters', 3)) == []
+
+def test_iter_json_array_reads_lazily():
+    """Test that items are decoded before the rest of the file is read"""
+    text = json.dumps({'characters': [{'name': 'Sol Badguy'}, {'name': 'Ky Kiske'}]})
+    f = io.StringIO(text + ' garbage that is never reached' * 1000)
+    items = iter_json_array(f, 'characters', 8)
+    assert next(items) == {'name': 'Sol Badguy'}
+    assert f.tell() < len(text)
+
+def test_iter_json_array_rejects_bad_documents():
+    """Test that missing keys and malformed or truncated JSON raise errors"""
+    with pytest.raises(KeyError):
+        list(iter_json_array(io.StringIO('{"cargoquery": []}'), 'characters'))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO('{"characters": [{"name": "Sol"} {"name": "Ky"}]}'), 'characters', 4))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO('{"characters": [{"name": "So'), 'characters', 4))
@@ -0,0 +1,27 @@
+from scraper.commands.parse import NORMAL_MOVE_SCHEMA, SPECIAL_MOVE_SCHEMA
+from scraper.normalize import column_name, normalize_table
+
+def test_normalize_table_applies_rules():
+    """Test that headers are renamed, blanks dropped and plain numbers converted"""
+    rows = [{'': '', 'input': ' 5P ', 'damage': '20', 'on_block': '-1', 'on_hit': '+2', 'level': '0',
+             'invuln': '', 'active': '3(3)2', 'r․i․s․c․_gain': '500', 'guard': 'Air Throw  [Ground Throw]'}]
+    normalized, unresolved = normalize_table(rows, NORMAL_MOVE_SCHEMA)
+
+    assert normalized == [{'input': '5P', 'damage': 20, 'on_block': -1, 'on_hit': '+2', 'level': '0',
+                           'invuln': None, 'active': '3(3)2', 'risc_gain': 500, 'guard': 'Air Throw [Ground Throw]'}]
+    assert unresolved == {}
+    assert column_name('risk_loss') == 'risc_loss'
+
+def test_normalize_table_reports_unresolved_rows():
+    """Test that rows the rules can't fix are reported with their reasons"""
+    rows = [
+        {'input': '236P', 'name': 'That&#039;s a lot', 'proration': '80%'},
+        {'input': '214K', 'name': '', 'proration': '80$'},
+        {'input': '623S', 'name': 'Volcanic Viper', 'notes': 'Invincible'},
+    ]
+    normalized, unresolved = normalize_table(rows, SPECIAL_MOVE_SCHEMA)
+
+    assert normalized[0]['name'] == "That's a lot"
+    assert sorted(unresolved) == [1, 2]
+    assert unresolved[1] == ["proration '80$' has no percentage", 'missing required name']
+    assert unresolved[2] == ["unknown column 'notes'"]
@@ -0,0 +1,268 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from openai import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
+from rich.progress import Progress
+import os
+import pytest
+from scraper.commands import parse
+from scraper.normalize import normalize_table
+from scraper.commands.parse import SectionIndex, extract_character_tables, extract_table_data, load_soup, parse_frame_data
+
+def get_test_soup(filename):
+    """Helper to load a saved page the way parse-data does"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return load_soup(os.path.join(current_dir, '..', filename))
+
+def test_section_index_lookups():
+    """Test that tables are found by heading text and by mw-headline id"""
+    index = SectionIndex(get_test_soup('frame_data.html'))
+    by_text = index.find_table('Normal_Moves')
+    assert by_text is not None
+    assert index.by_headline_id['Normal_Moves']['table'] is by_text
+    assert index.find_table('Overdrives') is index.by_headline_id['Overdrives']['table']
+    assert index.find_table('System_Core') is None
+
+def test_extract_character_tables_matches_single_lookups():
+    """Test that one indexed pass extracts the same rows as separate lookups"""
+    soup = get_test_soup('frame_data.html')
+    tables = extract_character_tables(soup, 'Sol Badguy')
+    assert len(tables['normal_moves']) > 0
+    assert tables['normal_moves'] == extract_table_data(soup, 'Normal_Moves', 'Sol Badguy')
+    assert tables['special_moves'] == extract_table_data(soup, 'Special_Moves', 'Sol Badguy')
+    assert tables['overdrive_moves'] == extract_table_data(soup, 'Overdrives', 'Sol Badguy')
+
+def test_parallel_parse_is_ordered_and_isolates_failures(tmp_path):
+    """Test that a process pool keeps file order and skips characters that fail"""
+    input_dir = tmp_path / 'html'
+    input_dir.mkdir()
+    page = get_test_soup('frame_data.html')
+    html = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frame_data.html'), 'rb').read()
+    for name in ['sol_badguy', 'ky_kiske']:
+        (input_dir / f'{name}_frame_data.html').write_bytes(html)
+    # A directory can't be read as a page, so this character fails
+    (input_dir / 'broken_frame_data.html').mkdir()
+
+    output_file = tmp_path / 'parsed.json'
+    parse_frame_data(input_dir, output_file, jobs=2)
+
+    data = json.loads(output_file.read_text())
+    assert [char['name'] for char in data['characters']] == ['Ky Kiske', 'Sol Badguy']
+    normal_moves, _ = normalize_table(extract_table_data(page, 'Normal_Moves', 'Ky Kiske'), parse.NORMAL_MOVE_SCHEMA)
+    assert data['characters'][0]['normal_moves'] == normal_moves
+    assert (tmp_path / 'intermediate' / 'ky_kiske_raw.json').exists()
+    assert not (tmp_path / 'intermediate' / 'broken_raw.json').exists()
+
+    report = json.loads((tmp_path / 'intermediate' / 'validation_report.json').read_text())
+    assert sorted(report) == ['Ky Kiske', 'Sol Badguy']
+    assert report['Ky Kiske']['cleaned'] == parse.validate_character(data['characters'][0])
+
+def test_unchanged_files_reuse_raw_data(tmp_path, monkeypatch):
+    """Test that only HTML files that changed since the last run are parsed again"""
+    input_dir = tmp_path / 'html'
+    input_dir.mkdir()
+    html = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frame_data.html'), 'rb').read()
+    for name in ['sol_badguy', 'ky_kiske']:
+        (input_dir / f'{name}_frame_data.html').write_bytes(html)
+    output_file = tmp_path / 'parsed.json'
+    parse_frame_data(input_dir, output_file)
+    first_run = output_file.read_text()
+
+    parsed = []
+    original = parse.parse_character_file
+    monkeypatch.setattr(parse, 'parse_character_file', lambda html_file, *args: parsed.append(html_file.name) or original(html_file, *args))
+
+    parse_frame_data(input_dir, output_file)
+    assert parsed == []
+    assert output_file.read_text() == first_run
+
+    (input_dir / 'sol_badguy_frame_data.html').write_bytes(html + b'<!-- edited -->')
+    parse_frame_data(input_dir, output_file)
+    assert parsed == ['sol_badguy_frame_data.html']
+
+    monkeypatch.setattr(parse, 'PARSER_VERSION', parse.PARSER_VERSION + 1)
+    parse_frame_data(input_dir, output_file)
+    assert len(parsed) == 3, "A new parser version should parse everything again"
+
+def test_raw_data_from_older_parser_is_not_reused(tmp_path, monkeypatch):
+    """Test that raw data extracted by an earlier PARSER_VERSION is parsed again"""
+    input_dir = tmp_path / 'html'
+    input_dir.mkdir()
+    html = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frame_data.html'), 'rb').read()
+    (input_dir / 'sol_badguy_frame_data.html').write_bytes(html)
+    output_file = tmp_path / 'parsed.json'
+    parse_frame_data(input_dir, output_file)
+
+    # Rewrite the manifest as the version before the overdrive fallback change left it
+    manifest_file = tmp_path / 'intermediate' / 'parse_manifest.json'
+    manifest = json.loads(manifest_file.read_text())
+    assert manifest['sol_badguy_frame_data.html']['parser_version'] == parse.PARSER_VERSION
+    manifest['sol_badguy_frame_data.html']['parser_version'] = 1
+    manifest_file.write_text(json.dumps(manifest))
+
+    parsed = []
+    original = parse.parse_character_file
+    monkeypatch.setattr(parse, 'parse_character_file', lambda html_file, *args: parsed.append(html_file.name) or original(html_file, *args))
+    parse_frame_data(input_dir, output_file)
+    assert parsed == ['sol_badguy_frame_data.html'], "Raw data from the old extraction should not be reused"
+    assert json.loads(manifest_file.read_text())['sol_badguy_frame_data.html']['parser_version'] == parse.PARSER_VERSION
+
+def test_chat_completion_retries_rate_limits(monkeypatch):
+    """Test that 429s are retried after the server's Retry-After"""
+    sleeps = []
+    monkeypatch.setattr(parse.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(parse.random, 'uniform', lambda low, high: 0)
+    rate_limited = RateLimitError.__new__(RateLimitError)
+    rate_limited.response = SimpleNamespace(headers={'retry-after': '2'})
+    replies = [rate_limited, 'done']
+
+    def create(**kwargs):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert parse.create_chat_completion(client, None, messages=[{'role': 'user', 'content': '{}'}]) == 'done'
+    assert sleeps == [2]
+
+def test_chat_completion_retries_transient_errors(monkeypatch):
+    """Test that dropped connections and 5xx are retried with backoff but other errors are not"""
+    sleeps = []
+    monkeypatch.setattr(parse.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(parse.random, 'uniform', lambda low, high: high)
+    dropped = APIConnectionError.__new__(APIConnectionError)
+    unavailable = InternalServerError.__new__(InternalServerError)
+    unavailable.response = SimpleNamespace(headers={})
+    unavailable.status_code = 503
+    bad_request = BadRequestError.__new__(BadRequestError)
+    bad_request.status_code = 400
+    replies = [dropped, unavailable, 'done', bad_request]
+
+    def create(**kwargs):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    messages = [{'role': 'user', 'content': '{}'}]
+    assert parse.create_chat_completion(client, None, messages=messages) == 'done'
+    assert sleeps == [0.5, 1.0]
+    with pytest.raises(BadRequestError):
+        parse.create_chat_completion(client, None, messages=messages)
+    assert len(sleeps) == 2
+
+def test_request_limiter_spaces_requests(monkeypatch):
+    """Test that requests wait for both the request and the token budget"""
+    now = [100.0]
+    sleeps = []
+    monkeypatch.setattr(parse.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(parse.time, 'sleep', sleeps.append)
+    limiter = parse.RequestLimiter(requests_per_minute=60, tokens_per_minute=600)
+
+    limiter.wait(300)
+    limiter.wait(100)
+    assert sleeps == [1.0], "The second request waits for the next request slot"
+    limiter.wait(600)
+    assert sleeps[-1] == 40.0, "A request larger than what's left waits for the bucket to refill"
+
+def sent_table(messages):
+    """Helper to decode the compact table in a cleaning prompt"""
+    return json.loads(messages[-1]['content'].split('Data: ', 1)[1].split('\n', 1)[0])
+
+def fake_client(reply_for):
+    """Helper for a client whose completions reply with reply_for(table)"""
+    def create(messages, **kwargs):
+        content = json.dumps(reply_for(sent_table(messages)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def name_moves(table):
+    """Helper reply that names every move after its input"""
+    column = table['columns'].index('input')
+    return {'patches': [[i, 'name', f'Move {row[column]}'] for i, row in enumerate(table['rows'])]}
+
+def test_cleaning_cache_only_sends_changed_rows(tmp_path):
+    """Test that only unresolved rows the cache hasn't seen reach the model"""
+    sent = []
+    client = fake_client(lambda table: sent.append(table) or name_moves(table))
+
+    def raw_data():
+        return {'name': 'Sol Badguy', 'normal_moves': [{'input': '5P', 'damage': '20'}],
+                'special_moves': [{'input': '236P'}, {'input': '214K'}],
+                'overdrive_moves': [], 'system_core': [], 'system_jump': []}
+    cache = parse.CleaningCache(tmp_path / 'clean_cache.json')
+    first = parse.clean_character_data(client, raw_data(), Progress(), tmp_path, cache=cache)
+    assert first['normal_moves'] == [{'input': '5P', 'damage': 20}], "The rules alone should resolve this row"
+    assert [row['name'] for row in first['special_moves']] == ['Move 236P', 'Move 214K']
+    assert len(sent) == 1 and sent[0]['table'] == 'special_moves'
+    cache.save()
+
+    cache = parse.CleaningCache(tmp_path / 'clean_cache.json')
+    assert parse.clean_character_data(client, raw_data(), Progress(), tmp_path, cache=cache) == first
+    assert len(sent) == 1, "Unchanged rows should not be sent again"
+
+    changed = raw_data()
+    changed['special_moves'][1] = {'input': '623S'}
+    cleaned = parse.clean_character_data(client, changed, Progress(), tmp_path, cache=cache)
+    assert len(sent) == 2
+    assert sent[-1] == {'table': 'special_moves', 'columns': ['input'], 'rows': [['623S']]}
+    assert [row['name'] for row in cleaned['special_moves']] == ['Move 236P', 'Move 623S']
+
+def test_patches_apply_locally():
+    """Test that compact tables round-trip and patch replies only touch the cells they name"""
+    rows = [{'input': '5P', 'damage': '22', 'r․i․s․c․_gain': '300'}, {'input': '5K', 'guard': 'All'}]
+    table = json.loads(parse.encode_table('normal_moves', rows))
+    assert table['columns'] == ['input', 'damage', 'r․i․s․c․_gain', 'guard']
+    assert table['rows'][1] == ['5K', None, None, 'All']
+
+    reply = {'renames': {'r․i․s․c․_gain': 'risc_gain'}, 'patches': [[0, 'damage', 22], [1, 'startup', 3]]}
+    assert parse.apply_patches(rows, reply) == [
+        {'input': '5P', 'damage': 22, 'risc_gain': '300'},
+        {'input': '5K', 'guard': 'All', 'startup': 3},
+    ]
+    assert rows[0]['damage'] == '22', "The raw rows should be left alone"
+    bad_replies = [
+        [],
+        {'patches': [[2, 'damage', 1]]},
+        {'patches': [['0', 'damage', 1]]},
+        {'patches': [[True, 'damage', 1]]},
+        {'renames': {'damage': 'input'}},
+    ]
+    for bad_reply in bad_replies:
+        with pytest.raises(ValueError):
+            parse.apply_patches(rows, bad_reply)
+
+def test_prune_for_prompt_keeps_move_tables():
+    """Test that pruning keeps section headings and table rows but drops markup and skipped sections"""
+    soup = get_test_soup('frame_data.html')
+    pruned = parse.prune_for_prompt(soup)
+
+    assert '## Overdrives' in pruned
+    assert '## Glossary' not in pruned and '## Navigation' not in pruned
+    assert '<' not in pruned, "No markup should be left"
+    for move in extract_table_data(soup, 'Overdrives'):
+        assert move['input'] in pruned
+    assert len(pruned) * 10 < len(str(soup))
+
+def test_cleaning_chunks_are_validated_and_retried_alone(tmp_path):
+    """Test that a chunk whose reply breaks the schema is resent on its own"""
+    sent = []
+
+    def break_214k_once(table):
+        sent.append(table['rows'][0][0])
+        if table['rows'][0][0] == '214K' and sent.count('214K') == 1:
+            return {'patches': [[0, 'name', None]]}  # name must be a string
+        return name_moves(table)
+    client = fake_client(break_214k_once)
+
+    char_data = {'name': 'Sol Badguy', 'normal_moves': [{'input': '5P', 'proration': '80$'}],
+                 'special_moves': [{'input': '236P'}, {'input': '214K'}, {'input': '623S'}],
+                 'overdrive_moves': [], 'system_core': [], 'system_jump': []}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        cleaned = parse.clean_character_data(client, char_data, Progress(), tmp_path, executor=executor, chunk_rows=1)
+
+    assert sorted(sent) == ['214K', '214K', '236P', '5P', '623S']
+    assert [row['name'] for row in cleaned['special_moves']] == ['Move 236P', 'Move 214K', 'Move 623S']
+    assert parse.validate_character(cleaned) == []
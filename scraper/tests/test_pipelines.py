@@ -0,0 +1,51 @@
+import gzip
+import json
+from scraper.pipelines import DustloopPipeline
+from scraper.spiders.dustloop_spider import DustloopSpider
+
+def make_table(index):
+    """Helper to build a minimal scraped table item"""
+    return {
+        'character': 'Sol_Badguy',
+        'table_name': f'Sol_Badguy.table_{index}',
+        'table_type': 'normal_moves',
+        'headers': ['input', 'damage'],
+        'rows': [{'input': '5P', 'damage': '28'}],
+    }
+
+def test_streams_jsonl_records(tmp_path):
+    """Test that each table is written as one compact JSON line"""
+    spider = DustloopSpider()
+    pipeline = DustloopPipeline(output=str(tmp_path / 'tables.jsonl'))
+    pipeline.open_spider(spider)
+    for i in range(3):
+        pipeline.process_item(make_table(i), spider)
+    pipeline.close_spider(spider)
+
+    lines = (tmp_path / 'tables.jsonl').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 3, "Should write one line per table"
+    assert json.loads(lines[2]) == make_table(2), "Records should round-trip"
+    assert ', ' not in lines[0], "Records should be compact"
+
+def test_flushes_before_close(tmp_path):
+    """Test that finished records reach disk before the spider closes"""
+    spider = DustloopSpider()
+    pipeline = DustloopPipeline(output=str(tmp_path / 'tables.jsonl'), flush_every=2)
+    pipeline.open_spider(spider)
+    for i in range(5):
+        pipeline.process_item(make_table(i), spider)
+
+    lines = (tmp_path / 'tables.jsonl').read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 4, "Flushed records should be on disk mid-crawl"
+    pipeline.close_spider(spider)
+
+def test_gzip_output(tmp_path):
+    """Test that gzip output gets a .gz suffix and decompresses to JSONL"""
+    spider = DustloopSpider()
+    pipeline = DustloopPipeline(output=str(tmp_path / 'tables.jsonl'), compress=True)
+    pipeline.open_spider(spider)
+    pipeline.process_item(make_table(0), spider)
+    pipeline.close_spider(spider)
+
+    with gzip.open(tmp_path / 'tables.jsonl.gz', 'rt', encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == [make_table(0)]
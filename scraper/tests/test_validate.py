@@ -0,0 +1,63 @@
+import copy
+import os
+from scraper.commands.parse import CHARACTER_DATA_SCHEMA, extract_character_tables, load_soup
+from scraper.validate import compile_validator, schema_errors
+
+def get_character():
+    """Helper to extract a character from the test page"""
+    page = load_soup(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'frame_data.html'))
+    return {'name': 'Sol Badguy', **extract_character_tables(page, 'Sol Badguy')}
+
+def test_compiled_validator_matches_schema_errors():
+    """Test that the generated validator reports the same errors as walking the schema"""
+    validate = compile_validator(CHARACTER_DATA_SCHEMA)
+    character = get_character()
+    bad = copy.deepcopy(character)
+    bad['normal_moves'][0]['damage'] = True  # bool is not a JSON integer
+    bad['normal_moves'][1]['startup'] = 1.5
+    del bad['special_moves'][0]['input']
+    bad['system_core'] = 'none'
+    del bad['system_jump']
+
+    assert validate(character) == schema_errors(character, CHARACTER_DATA_SCHEMA)
+    assert validate(bad) == schema_errors(bad, CHARACTER_DATA_SCHEMA)
+    assert validate(bad) == [
+        "$ is missing required field 'system_jump'",
+        '$.normal_moves[0].damage should be string or integer or null, got bool',
+        '$.normal_moves[1].startup should be string or integer or null, got float',
+        "$.special_moves[0] is missing required field 'input'",
+        '$.system_core should be array, got str',
+    ]
+    assert validate([], 'Sol') == ['Sol should be object, got list']
+
+def test_compiled_validator_handles_closed_and_nested_objects():
+    """Test that unexpected fields, nested objects and untyped values are checked"""
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "anything": {},
+            "hitbox": {"type": ["object", "null"], "properties": {"x": {"type": "number"}}, "required": ["x"]},
+        },
+        "additionalProperties": False,
+    }
+    validate = compile_validator(schema)
+    for value in [{"id": 1, "anything": [1], "hitbox": None},
+                  {"id": "1", "hitbox": {"y": 2}, "extra": True},
+                  {"hitbox": {"x": "wide"}}]:
+        assert validate(value) == schema_errors(value, schema)
+    assert validate({"id": "1", "hitbox": {"y": 2}, "extra": True}) == [
+        '$.id should be integer, got str',
+        "$.hitbox is missing required field 'x'",
+        "$ has unexpected field 'extra'",
+    ]
+
+def test_compiled_validator_only_walks_closed_objects():
+    """Test that fields are looked up per property and only walked when extra fields are errors"""
+    validate = compile_validator(CHARACTER_DATA_SCHEMA)
+    assert '.items()' not in validate.source and 'for f' not in validate.source
+    assert ".get('damage', _MISSING)" in validate.source
+
+    closed = compile_validator({"type": "object", "properties": {"id": {"type": "integer"}}, "additionalProperties": False})
+    assert 'for f' in closed.source
+    assert closed({"extra": 1, "id": "1"}) == ['$.id should be integer, got str', "$ has unexpected field 'extra'"]